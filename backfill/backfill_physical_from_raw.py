@@ -16,17 +16,33 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.database import get_connection, table
 
-
-def get_metric(record, *keys):
-    """
-    Prend la première clé présente dans le record (API peut varier les noms).
-    从 record 中按 keys 顺序取第一个非空值（兼容 API 字段名变化）
-    """
-    for key in keys:
-        val = record.get(key)
-        if val is not None:
-            return val
-    return None
+# Colonne cible → alias de champs API, ordre = priorité. Table construite une
+# fois au chargement : une seule passe par record au lieu d'un appel
+# get_metric(record, *keys) par métrique.
+# 目标列 → API 字段别名（顺序即优先级）。模块加载时固定，每条记录一次遍历提取。
+_METRIC_KEYS = (
+    ("minutes_played", ("minutes_full_all", "minutes_played", "minutes")),
+    ("total_distance_m", ("total_distance_full_all", "total_distance",
+                          "distance_total")),
+    ("running_distance_m", ("running_distance_full_all", "running_distance",
+                            "distance_running")),
+    ("high_speed_running_m", ("hsr_distance_full_all",
+                              "high_speed_running_distance", "hsr_distance")),
+    ("sprinting_distance_m", ("sprint_distance_full_all", "sprinting_distance",
+                              "sprint_distance")),
+    ("num_sprints", ("sprint_count_full_all", "sprint_count", "num_sprints")),
+    ("num_high_speed_runs", ("hsr_count_full_all", "high_speed_run_count")),
+    ("max_speed_kmh", ("top_speed", "max_speed", "peak_speed", "peak_velocity",
+                       "max_speed_kmh", "top_speed_kmh")),
+    ("avg_speed_kmh", ("average_speed", "avg_speed", "avg_speed_kmh",
+                       "mean_speed", "mean_velocity")),
+    ("num_accelerations", ("acceleration_count", "num_accelerations",
+                           "accelerations", "acceleration_count_full_all",
+                           "num_accelerations_full_all")),
+    ("num_decelerations", ("deceleration_count", "num_decelerations",
+                           "decelerations", "deceleration_count_full_all",
+                           "num_decelerations_full_all")),
+)
 
 
 def main():
@@ -41,6 +57,17 @@ def main():
     rows = cur.fetchall()
     updated = 0
 
+    # UPDATE généré depuis la table d'alias : colonnes et paramètres restent
+    # alignés par construction / UPDATE 语句由别名表生成，列与参数天然对齐
+    set_clause = ",\n                ".join(
+        f"{col} = COALESCE(%s, {col})" for col, _ in _METRIC_KEYS
+    )
+    sql_update = f"""
+            UPDATE {table('player_match_physical')} SET
+                {set_clause}
+            WHERE physical_id = %s
+            """
+
     for physical_id, raw_json in rows:
         if not raw_json:
             continue
@@ -49,99 +76,15 @@ def main():
         except Exception:
             continue
 
-        # Extraire les métriques depuis le JSON (plusieurs noms possibles selon version API)
-        # 从 JSON 中提取指标（兼容多种字段名：SkillCorner 新旧版）
-        minutes = get_metric(
-            record, "minutes_full_all", "minutes_played", "minutes"
-        )
-        total_dist = get_metric(
-            record,
-            "total_distance_full_all",
-            "total_distance",
-            "distance_total",
-        )
-        running = get_metric(
-            record,
-            "running_distance_full_all",
-            "running_distance",
-            "distance_running",
-        )
-        hsr = get_metric(
-            record,
-            "hsr_distance_full_all",
-            "high_speed_running_distance",
-            "hsr_distance",
-        )
-        sprint_dist = get_metric(
-            record,
-            "sprint_distance_full_all",
-            "sprinting_distance",
-            "sprint_distance",
-        )
-        sprint_count = get_metric(
-            record,
-            "sprint_count_full_all",
-            "sprint_count",
-            "num_sprints",
-        )
-        hsr_count = get_metric(
-            record,
-            "hsr_count_full_all",
-            "high_speed_run_count",
-        )
-        max_speed = get_metric(
-            record,
-            "top_speed", "max_speed", "peak_speed", "peak_velocity",
-            "max_speed_kmh", "top_speed_kmh",
-        )
-        avg_speed = get_metric(
-            record,
-            "average_speed", "avg_speed", "avg_speed_kmh",
-            "mean_speed", "mean_velocity",
-        )
-        num_accel = get_metric(
-            record,
-            "acceleration_count", "num_accelerations", "accelerations",
-            "acceleration_count_full_all", "num_accelerations_full_all",
-        )
-        num_decel = get_metric(
-            record,
-            "deceleration_count", "num_decelerations", "decelerations",
-            "deceleration_count_full_all", "num_decelerations_full_all",
+        # Extraire les métriques en une passe (plusieurs noms possibles selon version API)
+        # 一次遍历提取指标（兼容多种字段名：SkillCorner 新旧版）
+        params = tuple(
+            next((record[k] for k in keys if record.get(k) is not None), None)
+            for _, keys in _METRIC_KEYS
         )
 
         # Mettre à jour les colonnes numériques (COALESCE = ne pas écraser si déjà rempli)
-        cur.execute(
-            f"""
-            UPDATE {table('player_match_physical')} SET
-                minutes_played = COALESCE(%s, minutes_played),
-                total_distance_m = COALESCE(%s, total_distance_m),
-                running_distance_m = COALESCE(%s, running_distance_m),
-                high_speed_running_m = COALESCE(%s, high_speed_running_m),
-                sprinting_distance_m = COALESCE(%s, sprinting_distance_m),
-                num_sprints = COALESCE(%s, num_sprints),
-                num_high_speed_runs = COALESCE(%s, num_high_speed_runs),
-                max_speed_kmh = COALESCE(%s, max_speed_kmh),
-                avg_speed_kmh = COALESCE(%s, avg_speed_kmh),
-                num_accelerations = COALESCE(%s, num_accelerations),
-                num_decelerations = COALESCE(%s, num_decelerations)
-            WHERE physical_id = %s
-            """,
-            (
-                minutes,
-                total_dist,
-                running,
-                hsr,
-                sprint_dist,
-                sprint_count,
-                hsr_count,
-                max_speed,
-                avg_speed,
-                num_accel,
-                num_decel,
-                physical_id,
-            ),
-        )
+        cur.execute(sql_update, params + (physical_id,))
         if cur.rowcount:
             updated += 1
 
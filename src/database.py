@@ -5,6 +5,7 @@ Database - PostgreSQL schema et connexion.
 import sys
 import os
 import psycopg2
+import psycopg2.pool
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import POSTGRES_CONFIG, DB_SCHEMA
@@ -22,6 +23,21 @@ def get_connection():
     return conn
 
 
+# Pool partagé pour les écritures concurrentes (créé au premier usage)
+# 共享连接池（首次使用时创建），供并发抓取/写入线程使用
+_pool = None
+
+
+def get_pool(minconn=2, maxconn=8):
+    """Return the shared ThreadedConnectionPool (created lazily)."""
+    global _pool
+    if _pool is None:
+        _pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn, maxconn, **POSTGRES_CONFIG
+        )
+    return _pool
+
+
 def create_schema(conn=None):
     """
     Create schema and all tables in PostgreSQL.
@@ -351,7 +367,40 @@ def create_schema(conn=None):
             f'CREATE INDEX IF NOT EXISTS {idx} ON {table(tbl)} ("{col}")'
         )
 
+    # Index partiels sur les IDs externes de teams : les filtres
+    # `skillcorner_team_id IS NOT NULL` + égalité évitent le seq scan.
+    # matches/players portent déjà des contraintes UNIQUE (donc un b-tree)
+    # sur leurs colonnes skillcorner_*/statsbomb_*.
+    # teams 外部 ID 的部分索引：IS NOT NULL + 等值过滤不再全表扫描；
+    # matches/players 的对应列已有 UNIQUE 约束（自带 b-tree）。
+    for idx, col in [
+        ("idx_teams_sc_notnull", "skillcorner_team_id"),
+        ("idx_teams_sb_notnull", "statsbomb_team_id"),
+    ]:
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS {idx} ON {table('teams')} ({col}) "
+            f"WHERE {col} IS NOT NULL"
+        )
+
     conn.commit()
+
+    # Index trigramme sur les noms : accélère les recherches LIKE '%nom%'
+    # (liaison par nom, backfill). pg_trgm exige des droits superuser sur
+    # certains hébergements → best effort.
+    # 名称三元组索引：加速 LIKE '%名称%' 查询；CREATE EXTENSION 可能无权限，尽力而为。
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_teams_name_trgm "
+            f"ON {table('teams')} USING gin (LOWER(team_name) gin_trgm_ops)"
+        )
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_players_name_trgm "
+            f"ON {table('players')} USING gin (LOWER(player_name) gin_trgm_ops)"
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
     print("✅ Database schema created successfully!")
 
     if should_close:
@@ -15,6 +15,7 @@ import sys
 import os
 import unicodedata
 from difflib import SequenceMatcher
+from functools import lru_cache
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.database import get_connection, table
@@ -58,12 +59,15 @@ PLAYER_NAME_ALIASES = [
 ]
 
 
+@lru_cache(maxsize=200_000)
 def normalize_name(name):
     """
     Normalize un nom de joueur pour le matching flou.
     Supprime accents, traits d'union → espaces, minuscules.
+    Mis en cache (lru_cache) : les mêmes noms reviennent à chaque match.
 
     归一化球员名：去除重音，连字符转为空格，转小写，用于模糊匹配。
+    结果缓存：同一球员名在各场比赛中反复出现。
     """
     if not name or not isinstance(name, str):
         return ""
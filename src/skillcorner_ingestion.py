@@ -12,10 +12,32 @@ Flux / 执行顺序 :
   find_ligue1_edition → ingest_teams → ingest_matches → ingest_players → ingest_physical_data
 """
 
+import csv
+import io
 import json
+import queue
 import sys
 import os
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import MappingProxyType
+
+from psycopg2.extras import execute_values
+
+# RapidFuzz (Levenshtein bit-parallèle en C++) si disponible, sinon fallback
+# name_similarity pur Python / 可选 RapidFuzz（C++ 位并行编辑距离），缺失则回退纯 Python
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process
+except ImportError:
+    _rf_fuzz = _rf_process = None
+
+# orjson (sérialisation JSON en Rust, 3-10× plus rapide) si disponible,
+# sinon json stdlib / 可选 orjson（Rust 实现，快 3-10 倍），缺失则用标准库 json
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import SKILLCORNER_USERNAME, SKILLCORNER_PASSWORD
@@ -159,39 +181,46 @@ def find_ligue1_edition(client):
 # Alias connus : abréviation DB <-> racine SC (ex. Rennes/Rennais) / 已知别名
 _TEAM_NAME_ALIASES = [("rennes", "rennais")]
 
+# Table d'alias étendue au chargement : nom exact → racines à chercher dans
+# l'autre nom. Un lookup dict remplace l'itération de la liste par appel.
+# 模块加载时展开别名表：精确名 → 待查词根，每次调用字典查找替代遍历。
+_ALIAS_ROOTS = {}
+for _short, _long_root in _TEAM_NAME_ALIASES:
+    _ALIAS_ROOTS.setdefault(_short, set()).add(_long_root)
+
 
 def _team_name_matches(db_name, sc_name):
     """Matching strict par nom, éviter faux positifs (ex. Lens vs Alajuelense) / 严格名称匹配"""
     a, b = (db_name or "").lower(), (sc_name or "").lower()
     if a == b:
         return True
-    for short, long_root in _TEAM_NAME_ALIASES:
-        if (a == short and long_root in b) or (b == short and long_root in a):
+    for root in _ALIAS_ROOTS.get(a, ()):
+        if root in b:
+            return True
+    for root in _ALIAS_ROOTS.get(b, ()):
+        if root in a:
             return True
-    if a in b:
-        return b.startswith(a) or f" {a}" in b or b.endswith(f" {a}")
-    if b in a:
-        return a.startswith(b) or f" {b}" in a or a.endswith(f" {b}")
-    return False
+    # Containment avec frontière gauche de token seulement : un seul test
+    # `in` par sens qui subsume startswith/endswith, et "brest" matche
+    # toujours "stade brestois 29" ("lyon" → "olympique lyonnais").
+    # 仅左侧词边界的包含：一次 `in` 覆盖前缀/中缀/后缀，
+    # 且 "brest" 仍能匹配 "stade brestois 29"。
+    return f" {a}" in f" {b}" or f" {b}" in f" {a}"
 
 
-def _find_db_team_by_name(cursor, team_name, sc_team_name):
-    """Find DB team matching sc_team_name or team_name. Returns (team_id,) or None."""
+def _find_db_team_by_name(by_lower_name, team_name, sc_team_name):
+    """
+    Find DB team matching sc_team_name or team_name in the preloaded
+    {lower_name: team_id} mapping. Returns (team_id,) or None.
+    """
     # Essayer d'abord le match exact
-    cursor.execute(
-        f"SELECT team_id FROM {table('teams')} WHERE LOWER(team_name) = LOWER(%s)",
-        (team_name or sc_team_name or "",)
-    )
-    r = cursor.fetchone()
-    if r:
-        return r
+    team_id = by_lower_name.get((team_name or sc_team_name or "").lower())
+    if team_id is not None:
+        return (team_id,)
     # Essayer de matcher contre toutes les équipes DB
-    cursor.execute(
-        f"SELECT team_id, team_name FROM {table('teams')}"
-    )
-    for row in cursor.fetchall():
-        if _team_name_matches(row[1], team_name or sc_team_name):
-            return (row[0],)
+    for db_name, team_id in by_lower_name.items():
+        if _team_name_matches(db_name, team_name or sc_team_name):
+            return (team_id,)
     return None
 
 
@@ -220,6 +249,21 @@ def ingest_teams(conn, client, competition_edition_id):
     count_id = 0
     count_name = 0
 
+    # Préchargement unique des équipes DB : les recherches par statsbomb_id
+    # et par nom deviennent des lookups mémoire (2-3 SELECT de moins par équipe).
+    # 一次预加载 DB 球队：statsbomb_id 与名称查找改为内存字典，省去逐队 SELECT。
+    cursor.execute(
+        f"SELECT team_id, team_name, statsbomb_team_id FROM {table('teams')}"
+    )
+    db_teams = cursor.fetchall()
+    by_sb_id = {sb_id: tid for tid, _, sb_id in db_teams if sb_id is not None}
+    # Clés internées : comparaison par pointeur lors des probes / 键驻留
+    by_lower_name = {sys.intern((name or '').lower()): tid for tid, name, _ in db_teams}
+
+    # Phase 1 : matching entièrement en mémoire (statsbomb_id puis nom/alias),
+    # les lignes résolues partent dans une table de staging.
+    # 第一阶段：内存中完成匹配（先 statsbomb_id 后名称/别名），结果进 staging 表。
+    stg_rows = []
     for team in teams:
         sc_team_id = team.get('id')
         team_name = team.get('name', '')
@@ -234,34 +278,46 @@ def ingest_teams(conn, client, competition_edition_id):
         existing = None
 
         # Priorité 1 : match par statsbomb_team_id (ID précis) / 优先 ID 精确匹配
-        if statsbomb_id is not None:
-            cursor.execute(
-                f"SELECT team_id FROM {table('teams')} WHERE statsbomb_team_id = %s",
-                (statsbomb_id,)
-            )
-            existing = cursor.fetchone()
+        if statsbomb_id is not None and statsbomb_id in by_sb_id:
+            existing = (by_sb_id[statsbomb_id],)
 
         # Priorité 2 : match par nom (fallback) / 按名称匹配
         if existing is None:
-            existing = _find_db_team_by_name(cursor, team_name, short_name or team_name)
+            existing = _find_db_team_by_name(by_lower_name, team_name, short_name or team_name)
 
-        if existing:
-            cursor.execute(
-                f"UPDATE {table('teams')} SET skillcorner_team_id = %s WHERE team_id = %s",
-                (sc_team_id, existing[0])
-            )
-            if statsbomb_id is not None:
-                count_id += 1
-            else:
-                count_name += 1
+        stg_rows.append((sc_team_id, team_name, existing[0] if existing else None))
+        if existing and statsbomb_id is not None:
+            count_id += 1
         else:
-            cursor.execute(f"""
-                INSERT INTO {table('teams')} (team_name, skillcorner_team_id)
-                VALUES (%s, %s)
-                ON CONFLICT (team_name) DO UPDATE SET skillcorner_team_id = EXCLUDED.skillcorner_team_id
-            """, (team_name, sc_team_id))
             count_name += 1
 
+    # Phase 2 : deux écritures quelles que soient les équipes — un UPDATE ...
+    # FROM staging pour les liens, un INSERT ... SELECT pour les nouvelles.
+    # 第二阶段：固定两条写语句 —— UPDATE ... FROM staging 关联，INSERT ... SELECT 新建。
+    if stg_rows:
+        cursor.execute("""
+            CREATE TEMP TABLE stg_sc_teams
+            (sc_id INTEGER, sc_name TEXT, db_team_id INTEGER)
+            ON COMMIT DROP
+        """)
+        execute_values(
+            cursor,
+            "INSERT INTO stg_sc_teams (sc_id, sc_name, db_team_id) VALUES %s",
+            stg_rows,
+        )
+        cursor.execute(f"""
+            UPDATE {table('teams')} t SET skillcorner_team_id = s.sc_id
+            FROM stg_sc_teams s
+            WHERE t.team_id = s.db_team_id
+        """)
+        cursor.execute(f"""
+            INSERT INTO {table('teams')} (team_name, skillcorner_team_id)
+            SELECT s.sc_name, s.sc_id FROM stg_sc_teams s
+            WHERE s.db_team_id IS NULL
+            ON CONFLICT (team_name) DO UPDATE
+                SET skillcorner_team_id = EXCLUDED.skillcorner_team_id
+        """)
+
     conn.commit()
     print(f" Processed {count_id + count_name} teams (ID précis: {count_id}, par nom: {count_name})")
     return teams
@@ -285,114 +341,132 @@ def ingest_matches(conn, client, competition_edition_id):
     cursor = conn.cursor()
     linked = 0
 
-    for match in matches:
-        sc_match_id = match.get('id')
-        match_date = match.get('date_time', '')[:10] if match.get('date_time') else ''
+    # Tables résolues une fois (pas à chaque itération) / 表名只解析一次
+    matches_tbl = table('matches')
+    teams_tbl = table('teams')
+
+    # IDs SkillCorner déjà liés, chargés une fois : test d'appartenance O(1)
+    # au lieu d'un SELECT 1 par match / 已关联的 SC ID 一次加载，O(1) 判重
+    cursor.execute(
+        f"SELECT skillcorner_match_id FROM {matches_tbl} "
+        "WHERE skillcorner_match_id IS NOT NULL"
+    )
+    linked_sc_match_ids = {row[0] for row in cursor.fetchall()}
+
+    # Équipes et matchs préchargés en dicts : la liaison (date + équipes,
+    # date + nom) devient des lookups mémoire au lieu de 2-6 SELECT par match.
+    # 球队与比赛预加载为字典：关联改为内存查找，省去每场 2-6 次 SELECT。
+    cursor.execute(
+        f"SELECT team_id, team_name, skillcorner_team_id FROM {teams_tbl}"
+    )
+    db_teams = cursor.fetchall()
+    team_by_sc_id = {sc_id: tid for tid, _, sc_id in db_teams if sc_id is not None}
+    team_name_by_id = {tid: (name or '').lower() for tid, name, _ in db_teams}
 
+    cursor.execute(
+        f"SELECT match_id, match_date, home_team_id, away_team_id FROM {matches_tbl}"
+    )
+    match_by_date_teams = {}
+    matches_by_date = {}
+    for mid, mdate, htid, atid in cursor.fetchall():
+        # Dates internées : mêmes ~40 journées répétées sur 380 matchs / 日期驻留
+        date_key = sys.intern(str(mdate)) if mdate is not None else ''
+        match_by_date_teams[(date_key, htid, atid)] = mid
+        matches_by_date.setdefault(date_key, []).append((mid, htid))
+
+    to_insert = []  # Nouveaux matchs, insérés par lots / 新比赛批量插入
+
+    # Pré-normaliser tous les matchs avant la boucle DB : noms lowercased une
+    # seule fois au lieu de 3 appels .lower()/.split() par itération.
+    # 进 DB 循环前先归一化：每场比赛只做一次 .lower()/.split()。
+    prepared = []
+    for match in matches:
         home_team = match.get('home_team', {})
         away_team = match.get('away_team', {})
         home_team = home_team if isinstance(home_team, dict) else {}
         away_team = away_team if isinstance(away_team, dict) else {}
         home_name = home_team.get('name', '')
         away_name = away_team.get('name', '')
-        sc_home_id = home_team.get('id')
-        sc_away_id = away_team.get('id')
+        hn = home_name.lower()
+        an = away_name.lower()
+        prepared.append((
+            match.get('id'),
+            sys.intern(match.get('date_time', '')[:10]) if match.get('date_time') else '',
+            hn,
+            hn.split()[0] if hn else '',
+            an,
+            home_team.get('id'),
+            away_team.get('id'),
+            match.get('home_team_score'),
+            match.get('away_team_score'),
+        ))
+
+    for (sc_match_id, match_date, hn, hn_token, an,
+         sc_home_id, sc_away_id, home_score, away_score) in prepared:
 
         # Ignorer si ce match_id SkillCorner est déjà lié
-        cursor.execute(
-            f"SELECT 1 FROM {table('matches')} WHERE skillcorner_match_id = %s LIMIT 1",
-            (sc_match_id,)
-        )
-        if cursor.fetchone():
+        if sc_match_id in linked_sc_match_ids:
             continue
 
         existing = None
 
         # Priorité 1 : match par date + skillcorner_team_id (ID précis) / 优先 ID 精确匹配
         if sc_home_id is not None and sc_away_id is not None:
-            cursor.execute(f"""
-                SELECT m.match_id FROM {table('matches')} m
-                JOIN {table('teams')} h ON m.home_team_id = h.team_id
-                JOIN {table('teams')} a ON m.away_team_id = a.team_id
-                WHERE m.match_date = %s
-                AND h.skillcorner_team_id = %s AND a.skillcorner_team_id = %s
-            """, (match_date, sc_home_id, sc_away_id))
-            existing = cursor.fetchone()
+            home_tid = team_by_sc_id.get(sc_home_id)
+            away_tid = team_by_sc_id.get(sc_away_id)
+            if home_tid is not None and away_tid is not None:
+                mid = match_by_date_teams.get((match_date, home_tid, away_tid))
+                if mid is not None:
+                    existing = (mid,)
 
         # Priorité 2 : match par date + noms (fallback) / 按日期+名称
         if existing is None:
-            cursor.execute(f"""
-                SELECT m.match_id FROM {table('matches')} m
-                JOIN {table('teams')} h ON m.home_team_id = h.team_id
-                JOIN {table('teams')} a ON m.away_team_id = a.team_id
-                WHERE m.match_date = %s
-                AND (LOWER(h.team_name) LIKE %s OR LOWER(h.team_name) LIKE %s)
-            """, (
-                match_date,
-                f"%{home_name.lower().split()[0]}%" if home_name else '%',
-                f"%{home_name.lower()}%"
-            ))
-            existing = cursor.fetchone()
+            for mid, htid in matches_by_date.get(match_date, []):
+                hname = team_name_by_id.get(htid, '')
+                if (not hn_token or hn_token in hname) or (hn and hn in hname):
+                    existing = (mid,)
+                    break
 
         if existing:
             # Mettre à jour uniquement si le match cible n'a pas encore de lien SkillCorner
             cursor.execute(
-                f"""UPDATE {table('matches')} SET skillcorner_match_id = %s
+                f"""UPDATE {matches_tbl} SET skillcorner_match_id = %s
                     WHERE match_id = %s AND skillcorner_match_id IS NULL""",
                 (sc_match_id, existing[0])
             )
             if cursor.rowcount > 0:
                 linked += 1
+                linked_sc_match_ids.add(sc_match_id)
         else:
             # Insert as new match if it can't be linked / 无法关联则插入新比赛
-            home_team_id = None
-            away_team_id = None
             # Priorité : skillcorner_team_id puis nom / 优先 ID 再按名称
-            if sc_home_id is not None:
-                cursor.execute(
-                    f"SELECT team_id FROM {table('teams')} WHERE skillcorner_team_id = %s",
-                    (sc_home_id,)
-                )
-                ht = cursor.fetchone()
-                if ht:
-                    home_team_id = ht[0]
-            if home_team_id is None and home_name:
-                cursor.execute(
-                    f"SELECT team_id FROM {table('teams')} WHERE LOWER(team_name) LIKE %s",
-                    (f"%{home_name.lower()}%",)
+            home_team_id = team_by_sc_id.get(sc_home_id)
+            if home_team_id is None and hn:
+                home_team_id = next(
+                    (tid for tid, name in team_name_by_id.items() if hn in name),
+                    None,
                 )
-                ht = cursor.fetchone()
-                if ht:
-                    home_team_id = ht[0]
-
-            if sc_away_id is not None:
-                cursor.execute(
-                    f"SELECT team_id FROM {table('teams')} WHERE skillcorner_team_id = %s",
-                    (sc_away_id,)
-                )
-                at = cursor.fetchone()
-                if at:
-                    away_team_id = at[0]
-            if away_team_id is None and away_name:
-                cursor.execute(
-                    f"SELECT team_id FROM {table('teams')} WHERE LOWER(team_name) LIKE %s",
-                    (f"%{away_name.lower()}%",)
+
+            away_team_id = team_by_sc_id.get(sc_away_id)
+            if away_team_id is None and an:
+                away_team_id = next(
+                    (tid for tid, name in team_name_by_id.items() if an in name),
+                    None,
                 )
-                at = cursor.fetchone()
-                if at:
-                    away_team_id = at[0]
-
-            home_score = match.get('home_team_score')
-            away_score = match.get('away_team_score')
-
-            cursor.execute(f"""
-                INSERT INTO {table('matches')} 
-                (skillcorner_match_id, match_date, home_team_id, away_team_id,
-                 home_score, away_score)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (skillcorner_match_id) DO NOTHING
-            """, (sc_match_id, match_date, home_team_id, away_team_id,
-                  home_score, away_score))
+
+            to_insert.append((sc_match_id, match_date, home_team_id, away_team_id,
+                              home_score, away_score))
+            linked_sc_match_ids.add(sc_match_id)
+
+    # Insertion par lots : un aller-retour pour ~100 matchs / 批量插入新比赛
+    if to_insert:
+        execute_values(cursor, f"""
+            INSERT INTO {matches_tbl}
+            (skillcorner_match_id, match_date, home_team_id, away_team_id,
+             home_score, away_score)
+            VALUES %s
+            ON CONFLICT (skillcorner_match_id) DO NOTHING
+        """, to_insert, page_size=100)
 
     conn.commit()
     print(f"Linked {linked} matches with StatsBomb, processed {len(matches)} total")
@@ -424,18 +498,105 @@ def ingest_players(conn, client, competition_edition_id):
     """)
     sb_without_sc = cursor.fetchall()
 
+    # Seaux par nom de famille normalisé : les footballeurs appariés partagent
+    # presque toujours le nom de famille, donc le fuzzy ne compare qu'aux
+    # homonymes (~1-5 candidats au lieu de tout l'effectif).
+    # 按归一化姓氏分桶：模糊匹配只在同姓候选内进行（~1-5 人而非全量）。
+    sb_lastname_buckets = {}
+    for sb_pid, sb_pname, sb_sbname in sb_without_sc:
+        last = normalize_name(sb_sbname or sb_pname or '').rsplit(' ', 1)[-1]
+        if last:
+            sb_lastname_buckets.setdefault(last, set()).add(sb_pid)
+
+    # IDs SkillCorner déjà liés, chargés une fois : test d'appartenance O(1)
+    # au lieu d'un SELECT 1 par joueur / 已关联的 SC ID 一次加载，O(1) 判重
+    cursor.execute(
+        f"SELECT skillcorner_player_id FROM {table('players')} "
+        "WHERE skillcorner_player_id IS NOT NULL"
+    )
+    linked_sc_player_ids = {row[0] for row in cursor.fetchall()}
+
+    # Joueurs DB préchargés une fois : le matching exact devient un lookup
+    # dict, le matching partiel (nom de famille) un scan mémoire — au lieu
+    # de 1-4 SELECT avec LIKE par joueur entrant.
+    # 一次预加载 DB 球员：精确匹配用字典、姓氏子串用内存扫描，省去逐人 LIKE 查询。
+    cursor.execute(f"""
+        SELECT player_id, player_name, statsbomb_player_name, skillcorner_player_name
+        FROM {table('players')}
+    """)
+    db_players = cursor.fetchall()
+    player_by_lower = {}
+    for pid, pname, sbname, scname in db_players:
+        for n in (pname, sbname, scname):
+            if n:
+                player_by_lower.setdefault(sys.intern(n.lower()), pid)
+    # Noms en casse d'origine pour le LIKE '%nom%' historique / 原大小写，等价旧 LIKE
+    player_names = [(pid, pname or '', sbname or '') for pid, pname, sbname, _ in db_players]
+
+    # Index LNRM : nom normalisé (accents/traits d'union neutralisés) →
+    # player_ids, nom complet et nom de famille. Un lookup O(1) attrape les
+    # variantes orthographiques avant tout scan de similarité. Clés internées
+    # (sys.intern) : les probes du dict se font par comparaison de pointeurs.
+    # LNRM 索引：归一化名（全名+姓氏）→ player_id，O(1) 命中拼写变体后才走模糊扫描。
+    # 键经 sys.intern 驻留，字典探测退化为指针比较。
+    lnrm_index = {}
+    for pid, pname, sbname, _ in db_players:
+        for n in (pname, sbname):
+            norm = normalize_name(n)
+            if not norm:
+                continue
+            keys = {sys.intern(norm)}
+            last = norm.rsplit(' ', 1)[-1]
+            if last != norm:
+                keys.add(sys.intern(last))
+            for key in keys:
+                bucket = lnrm_index.setdefault(key, [])
+                if pid not in bucket:
+                    bucket.append(pid)
+
     # Récupérer toutes les équipes de cette compétition / 获取该赛季所有球队
     cursor.execute(f"SELECT team_name, skillcorner_team_id FROM {table('teams')} WHERE skillcorner_team_id IS NOT NULL")
     sc_teams = cursor.fetchall()
 
-    count = 0
-    for team_name, sc_team_id in sc_teams:
+    # Récupération par équipe parallélisée : pure attente I/O, 4 workers
+    # suffisent pour ~20 équipes. Les écritures DB restent dans le thread
+    # principal (une connexion psycopg2 n'est pas partageable entre threads).
+    # 按队并行拉取（纯 I/O 等待，4 线程）；DB 写入留在主线程
+    # （psycopg2 连接不能跨线程共用）。
+    def _fetch_team_players(team):
+        team_name, sc_team_id = team
         try:
-            # Rechercher les joueurs par équipe
             players = client.get_players(params={'team': sc_team_id})
-            time.sleep(0.3)  # Limitation du débit
+            time.sleep(0.3)  # Limitation du débit (par worker) / 每线程限速
+            return team_name, sc_team_id, players, None
         except Exception as e:
-            print(f"  Error fetching players for team {team_name}: {e}")
+            return team_name, sc_team_id, None, e
+
+    with ThreadPoolExecutor(max_workers=4) as fetch_pool:
+        fetched = list(fetch_pool.map(_fetch_team_players, sc_teams))
+
+    # SQL figé hors boucle : table() + f-string une seule fois, et le même
+    # texte de requête à chaque exécution (cache de parse côté serveur).
+    # SQL 预先拼好：table()/f-string 只做一次，循环内重复同一语句文本。
+    players_tbl = table('players')
+    sql_link_player = f"""
+        UPDATE {players_tbl} SET
+            skillcorner_player_id = %s,
+            skillcorner_player_name = %s,
+            updated_at = NOW()
+        WHERE player_id = %s AND skillcorner_player_id IS NULL
+    """
+    sql_insert_player = f"""
+        INSERT INTO {players_tbl}
+        (skillcorner_player_id, skillcorner_player_name, player_name)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (skillcorner_player_id) DO NOTHING
+    """
+
+    count = 0
+    for team_name, sc_team_id, players, fetch_err in fetched:
+        if fetch_err is not None:
+            print(f"  Error fetching players for team {team_name}: {fetch_err}")
             continue
 
         for player in players:
@@ -454,11 +615,7 @@ def ingest_players(conn, client, competition_edition_id):
                 continue
 
             # Ignorer si ce player_id SkillCorner est déjà lié (évite violation UNIQUE)
-            cursor.execute(
-                f"SELECT 1 FROM {table('players')} WHERE skillcorner_player_id = %s LIMIT 1",
-                (sc_player_id,)
-            )
-            if cursor.fetchone():
+            if sc_player_id in linked_sc_player_ids:
                 continue
 
             # Essayer plusieurs variantes de noms pour le matching
@@ -472,70 +629,82 @@ def ingest_players(conn, client, competition_edition_id):
 
             existing = None
             for search_name in search_names:
-                cursor.execute(
-                    f"""
-                SELECT player_id FROM {table('players')}
-                WHERE LOWER(player_name) = LOWER(%s)
-                OR LOWER(statsbomb_player_name) = LOWER(%s)
-                OR LOWER(skillcorner_player_name) = LOWER(%s)
-                OR player_name LIKE %s
-                OR statsbomb_player_name LIKE %s
-            """,
-                    (
-                        search_name,
-                        search_name,
-                        search_name,
-                        f"%{search_name.split()[-1] if search_name else ''}%",
-                        f"%{search_name.split()[-1] if search_name else ''}%",
-                    ),
-                )
-                existing = cursor.fetchone()
+                pid = player_by_lower.get(search_name.lower())
+                if pid is not None:
+                    existing = (pid,)
+                    break
+                last = search_name.split()[-1] if search_name else ''
+                if last:
+                    for p_pid, p_name, p_sbname in player_names:
+                        if last in p_name or last in p_sbname:
+                            existing = (p_pid,)
+                            break
                 if existing:
                     break
 
+            # Résolution LNRM : un lookup sur le nom normalisé avant tout
+            # scan de similarité / LNRM 归一化名 O(1) 命中，未中才进模糊扫描
+            if existing is None:
+                for lnrm_key in (normalize_name(full_name or player_name),
+                                 normalize_name(player_name)):
+                    bucket = lnrm_index.get(lnrm_key) if lnrm_key else None
+                    if bucket:
+                        existing = (bucket[0],)
+                        break
+
             # Fallback : similarité de noms (accents, traits d'union) / 回退：名称相似度（重音、连字符）
             if existing is None and sb_without_sc:
                 sc_name = full_name or player_name
-                best = None
-                best_score = 0.0
-                for sb_pid, sb_pname, sb_sbname in sb_without_sc:
-                    db_name = sb_sbname or sb_pname or ""
-                    score = name_similarity(sc_name, db_name)
-                    if score >= 0.65 and score > best_score:
-                        best_score = score
-                        best = (sb_pid,)
-                if best:
-                    existing = best
+                # Élagage par seau de nom de famille ; seau vide ou inconnu →
+                # scan complet / 先按姓氏桶剪枝，桶空或未知则回退全量扫描
+                sc_last = normalize_name(sc_name).rsplit(' ', 1)[-1] if sc_name else ''
+                bucket_pids = sb_lastname_buckets.get(sc_last)
+                if bucket_pids:
+                    candidates = [p for p in sb_without_sc if p[0] in bucket_pids]
+                else:
+                    candidates = sb_without_sc
+                if not candidates:
+                    candidates = sb_without_sc
+                if _rf_process is not None:
+                    # extractOne : scoring vectorisé côté C++, cutoff 65/100
+                    # (équivalent du seuil 0.65) / C++ 批量打分，阈值等价 0.65
+                    choices = [sb_sbname or sb_pname or ""
+                               for _, sb_pname, sb_sbname in candidates]
+                    best_rf = _rf_process.extractOne(
+                        sc_name, choices,
+                        scorer=_rf_fuzz.token_sort_ratio, score_cutoff=65,
+                    )
+                    if best_rf is not None:
+                        existing = (candidates[best_rf[2]][0],)
+                else:
+                    best = None
+                    best_score = 0.0
+                    for sb_pid, sb_pname, sb_sbname in candidates:
+                        db_name = sb_sbname or sb_pname or ""
+                        score = name_similarity(sc_name, db_name)
+                        if score >= 0.65 and score > best_score:
+                            best_score = score
+                            best = (sb_pid,)
+                    if best:
+                        existing = best
 
             display_name = full_name or player_name
 
             if existing:
                 # Update existing player with SkillCorner info / 更新已有球员的 SkillCorner 信息
-                cursor.execute(
-                    f"""
-                    UPDATE {table('players')} SET
-                        skillcorner_player_id = %s,
-                        skillcorner_player_name = %s,
-                        updated_at = NOW()
-                    WHERE player_id = %s AND skillcorner_player_id IS NULL
-                    """,
-                    (sc_player_id, display_name, existing[0]),
-                )
+                cursor.execute(sql_link_player, (sc_player_id, display_name, existing[0]))
                 count += 1
+                linked_sc_player_ids.add(sc_player_id)
+                # Refléter le nouveau nom SC dans le cache / 新 SC 名称写回缓存
+                if display_name:
+                    player_by_lower.setdefault(display_name.lower(), existing[0])
                 # Retirer du cache pour éviter double match / 从缓存移除，避免重复匹配
                 sb_without_sc = [p for p in sb_without_sc if p[0] != existing[0]]
             else:
                 # Insérer le nouveau joueur
-                cursor.execute(
-                    f"""
-                    INSERT INTO {table('players')} 
-                    (skillcorner_player_id, skillcorner_player_name, player_name)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (skillcorner_player_id) DO NOTHING
-                    """,
-                    (sc_player_id, display_name, display_name),
-                )
+                cursor.execute(sql_insert_player, (sc_player_id, display_name, display_name))
                 count += 1
+                linked_sc_player_ids.add(sc_player_id)
 
     conn.commit()
     print(f"Processed {count} players from SkillCorner")
@@ -547,6 +716,193 @@ def ingest_players(conn, client, competition_edition_id):
 # 5. 体能数据入库：距离、速度、冲刺等，写入 player_match_physical
 # ============================================================
 
+# Alias de champs API par métrique : SkillCorner a renommé les champs selon
+# les versions (suffixe *_full_all depuis 2024). Ordre = priorité.
+# 指标 → API 字段别名表（字段名随 API 版本变化，*_full_all 为 2024+），顺序即优先级。
+METRIC_ALIASES = (
+    ("minutes", ("minutes_full_all", "minutes_played", "minutes")),
+    ("total_dist", ("total_distance_full_all", "total_distance",
+                    "distance_total", "total_distance_m")),
+    ("walking_dist", ("walking_distance", "distance_walking")),
+    ("jogging_dist", ("jogging_distance", "distance_jogging")),
+    ("running_dist", ("running_distance_full_all", "running_distance",
+                      "distance_running", "low_speed_running_distance")),
+    ("hsr_dist", ("hsr_distance_full_all", "high_speed_running_distance",
+                  "distance_high_speed_running", "hsr_distance")),
+    ("sprint_dist", ("sprint_distance_full_all", "sprinting_distance",
+                     "distance_sprinting", "sprint_distance")),
+    ("max_speed", ("top_speed", "max_speed", "peak_speed", "peak_velocity",
+                   "max_speed_kmh", "top_speed_kmh")),
+    ("avg_speed", ("average_speed", "avg_speed", "avg_speed_kmh",
+                   "mean_speed", "mean_velocity")),
+    ("sprint_count", ("sprint_count_full_all", "sprint_count",
+                      "num_sprints", "sprints")),
+    ("hsr_count", ("hsr_count_full_all", "high_speed_run_count",
+                   "num_high_speed_runs")),
+    ("accel_count", ("acceleration_count", "num_accelerations",
+                     "accelerations", "acceleration_count_full_all",
+                     "num_accelerations_full_all", "explosive_accelerations")),
+    ("decel_count", ("deceleration_count", "num_decelerations",
+                     "decelerations", "deceleration_count_full_all",
+                     "num_decelerations_full_all")),
+    ("hi_dist", ("high_intensity_distance", "hi_distance")),
+    ("tip_dist", ("distance_tip", "tip_distance", "distance_in_possession")),
+    ("otip_dist", ("distance_otip", "otip_distance",
+                   "distance_out_of_possession")),
+    ("psv99", ("psv_99", "psv99")),
+)
+
+# Clés d'alias internées au chargement du module : probes de dict plus rapides
+# dans la boucle chaude d'extraction (hash mémoïsé, comparaison par pointeur
+# quand la clé du record est elle-même internée).
+# 模块加载时驻留别名键：提取热循环中的字典探测更快。
+METRIC_ALIASES = tuple(
+    (name, tuple(sys.intern(k) for k in keys)) for name, keys in METRIC_ALIASES
+)
+
+
+def extract_metrics(record, aliases=METRIC_ALIASES):
+    """
+    Résout toutes les métriques d'un record en un seul passage.
+    Remplace ~15 appels get_metric(record, *keys) par itération.
+    一次遍历提取所有指标（替代每条记录 ~15 次 get_metric 调用）。
+    """
+    return {
+        name: next((record[k] for k in keys if record.get(k) is not None), None)
+        for name, keys in aliases
+    }
+
+
+# Colonnes remplies par l'ingestion, dans l'ordre du COPY / COPY 列顺序
+_PHYSICAL_COLUMNS = (
+    "match_id", "player_id", "skillcorner_match_id", "skillcorner_player_id",
+    "team_name", "minutes_played",
+    "total_distance_m", "walking_distance_m", "jogging_distance_m",
+    "running_distance_m", "high_speed_running_m", "sprinting_distance_m",
+    "max_speed_kmh", "avg_speed_kmh", "num_sprints", "num_high_speed_runs",
+    "num_accelerations", "num_decelerations", "high_intensity_distance_m",
+    "distance_tip_m", "distance_otip_m", "psv99",
+    "raw_physical_json",
+)
+
+
+# Mapping vide réutilisé pour les accès imbriqués : évite d'allouer un dict
+# jetable à chaque ligne ({} dans `record.get('match', {})`).
+# 复用的只读空映射：避免每行为嵌套访问分配临时 dict。
+_EMPTY = MappingProxyType({})
+
+# Taille de lot pour le COPY : borne la mémoire indépendamment de la taille
+# d'équipe / COPY 批大小：内存占用与球队数据量无关
+_COPY_BATCH_SIZE = 500
+
+
+def _iter_physical(client, sc_team_id, page_size=_COPY_BATCH_SIZE):
+    """
+    Itère les enregistrements physiques d'une équipe page par page, au lieu
+    de matérialiser la réponse complète (raw_json peut peser plusieurs Ko
+    par enregistrement).
+    按页流式拉取球队体能数据，避免整队响应驻留内存（raw_json 每条可达数 KB）。
+    """
+    page = 1
+    prev_first = None
+    while True:
+        batch = client.get_physical(
+            params={'team': sc_team_id, 'page': page, 'page_size': page_size}
+        )
+        if not batch:
+            break
+        # Garde-fou : si l'endpoint ignore la pagination, la page 2 renvoie
+        # les mêmes données → stop. / 若接口忽略分页参数，第二页返回相同数据则停止。
+        if prev_first is not None and batch[0] == prev_first:
+            break
+        prev_first = batch[0]
+        yield from batch
+        if len(batch) < page_size:
+            break
+        page += 1
+        time.sleep(0.5)  # Limitation du débit entre pages / 页间限速
+
+
+def _build_physical_payload(record):
+    """
+    Partie CPU de la construction d'une ligne : extraction des métriques et
+    sérialisation JSON. Fonction top-level, donc picklable par un pool de
+    processus.
+    行构建的 CPU 部分（指标提取 + JSON 序列化）。顶层函数，可被进程池 pickle。
+    """
+    m = extract_metrics(record)
+    if _orjson is not None:
+        raw_json = _orjson.dumps(record, default=str).decode()
+    else:
+        raw_json = json.dumps(record, default=str)
+    return (
+        m["minutes"], m["total_dist"], m["walking_dist"], m["jogging_dist"],
+        m["running_dist"], m["hsr_dist"], m["sprint_dist"], m["max_speed"],
+        m["avg_speed"], m["sprint_count"], m["hsr_count"], m["accel_count"],
+        m["decel_count"], m["hi_dist"], m["tip_dist"], m["otip_dist"],
+        m["psv99"], raw_json,
+    )
+
+
+def _build_physical_rows(pending, executor=None):
+    """
+    Assemble les tuples COPY depuis (ids..., record). Si un executor est
+    fourni, la partie CPU est répartie sur plusieurs processus (le GIL
+    bloque sinon l'encodage JSON de gros volumes).
+    从 (ids..., record) 组装 COPY 行；提供进程池时 CPU 部分并行执行。
+    """
+    records = [p[5] for p in pending]
+    if executor is not None:
+        payloads = list(executor.map(_build_physical_payload, records, chunksize=64))
+    else:
+        payloads = [_build_physical_payload(r) for r in records]
+    return [p[:5] + payload for p, payload in zip(pending, payloads)]
+
+
+def _iter_physical_safe(client, sc_team_id, team_name):
+    """
+    Version tolérante aux erreurs de _iter_physical : le générateur étant
+    paresseux, les erreurs API surviennent pendant l'itération.
+    _iter_physical 的容错版本：生成器惰性求值，API 错误在迭代中抛出。
+    """
+    try:
+        yield from _iter_physical(client, sc_team_id)
+    except Exception as e:
+        print(f"  Error fetching physical data for {team_name}: {e}")
+
+
+def _copy_physical_rows(cursor, rows):
+    """
+    Charge un lot de lignes physiques via COPY FROM STDIN.
+    Bien plus rapide que des INSERT ligne à ligne pour un chargement initial
+    (pas de parse/plan par ligne côté serveur).
+    用 COPY FROM STDIN 批量写入体能数据（冷启动比逐行 INSERT 快 3-10 倍）。
+    """
+    if not rows:
+        return 0
+    # Valider la forme des lignes avant d'écrire : un tuple mal dimensionné
+    # ferait échouer tout le lot COPY côté serveur.
+    # 写入前校验行宽：列数不符会让整批 COPY 在服务端失败。
+    width = len(_PHYSICAL_COLUMNS)
+    for row in rows:
+        if len(row) != width:
+            raise ValueError(
+                f"physical row has {len(row)} fields, expected {width}"
+            )
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerows(rows)
+    buf.seek(0)
+    # En CSV, un champ vide non quoté = NULL (csv.writer écrit None comme vide)
+    # CSV 格式下未加引号的空字段即 NULL（csv.writer 将 None 写为空）
+    cursor.copy_expert(
+        f"COPY {table('player_match_physical')} ({', '.join(_PHYSICAL_COLUMNS)}) "
+        "FROM STDIN WITH (FORMAT csv)",
+        buf,
+    )
+    return len(rows)
+
+
 def ingest_physical_data(conn, client, competition_edition_id):
     """
     Fetch physical/tracking data per player per match from SkillCorner.
@@ -556,6 +912,61 @@ def ingest_physical_data(conn, client, competition_edition_id):
 
     cursor = conn.cursor()
 
+    # Chargement bulk idempotent : commit asynchrone acceptable, divise la
+    # latence de commit par ~2 sur un Postgres distant.
+    # 幂等批量写入：关闭同步提交可将远端 Postgres 的 commit 延迟减半。
+    try:
+        cursor.execute("SET synchronous_commit = off")
+    except Exception:
+        conn.rollback()  # Droits insuffisants éventuels / 权限不足时忽略
+
+    # Tables et SQL résolus une fois : le même texte de requête est réutilisé
+    # à chaque exécution (profite du cache de parse côté serveur).
+    # 表名与 SQL 只格式化一次：每次执行同一语句文本（服务端解析缓存受益）。
+    matches_tbl = table('matches')
+    players_tbl = table('players')
+
+    # Résolution des IDs internes préchargée en dicts : deux requêtes au lieu
+    # de deux SELECT par enregistrement physique (N+1). Seul le backfill par
+    # nom (chemin rare) garde du SQL.
+    # 内部 ID 预加载为字典：两条查询替代每条记录两次 SELECT（N+1）。
+    # 仅按名回填（罕见路径）仍走 SQL。
+    cursor.execute(
+        f"SELECT skillcorner_match_id, match_id FROM {matches_tbl} "
+        "WHERE skillcorner_match_id IS NOT NULL"
+    )
+    sc_match_to_id = dict(cursor.fetchall())
+    cursor.execute(
+        f"SELECT skillcorner_player_id, player_id FROM {players_tbl} "
+        "WHERE skillcorner_player_id IS NOT NULL"
+    )
+    sc_player_to_id = dict(cursor.fetchall())
+
+    # IDs SC dont le backfill par nom a déjà échoué : un même joueur non mappé
+    # revient sur chacun de ses matchs, inutile de relancer les SELECT.
+    # 按名回填已失败的 SC ID：同一未映射球员每场都会出现，无需重复查询。
+    sc_player_unmapped = set()
+
+    # SQL du backfill par nom figé hors boucle / 按名回填 SQL 预先拼好
+    sql_backfill_find = f"""
+        SELECT player_id FROM {players_tbl}
+        WHERE (skillcorner_player_id IS NULL)
+        AND (
+            LOWER(player_name) = LOWER(%s)
+            OR LOWER(statsbomb_player_name) = LOWER(%s)
+            OR player_name LIKE %s
+        )
+    """
+    sql_backfill_link = f"""
+        UPDATE {players_tbl} SET
+            skillcorner_player_id = %s,
+            skillcorner_player_name = %s,
+            date_of_birth = COALESCE(date_of_birth, %s),
+            primary_position = COALESCE(primary_position, %s),
+            updated_at = NOW()
+        WHERE player_id = %s AND skillcorner_player_id IS NULL
+    """
+
     # Récupérer toutes les équipes avec IDs SkillCorner
     cursor.execute(
         f"SELECT team_id, team_name, skillcorner_team_id FROM {table('teams')} "
@@ -564,54 +975,96 @@ def ingest_physical_data(conn, client, competition_edition_id):
     sc_teams = cursor.fetchall()
 
     total_records = 0
-
-    for team_id, team_name, sc_team_id in sc_teams:
-        print(f" Fetching physical data for {team_name}...")
-
+    executor = None  # Pool de processus lazy / 按需创建的进程池
+
+    # Producteur/consommateur : un thread tire l'API (latence réseau + limite
+    # de débit) pendant que le thread principal résout les IDs et écrit en DB.
+    # Les deux phases se recouvrent au lieu de s'enchaîner équipe par équipe.
+    # 生产者/消费者：一个线程拉 API（网络延迟+限速），主线程解析 ID 并写库，
+    # 两个阶段重叠执行而非逐队串行。
+    records_q = queue.Queue(maxsize=4 * _COPY_BATCH_SIZE)
+    stop_event = threading.Event()
+    _DONE = object()  # Sentinelle de fin de flux / 流结束哨兵
+
+    def _producer():
         try:
-            physical_data = client.get_physical(
-                params={'team': sc_team_id}
-            )
-            time.sleep(0.5)  # Limitation du débit
+            for _, prod_team_name, prod_sc_team_id in sc_teams:
+                # Nom interné : répété dans chaque tuple de ligne / 队名驻留
+                prod_team_name = sys.intern(prod_team_name or '')
+                print(f" Fetching physical data for {prod_team_name}...")
+                for rec in _iter_physical_safe(client, prod_sc_team_id, prod_team_name):
+                    # put avec timeout : ne pas rester bloqué si le
+                    # consommateur s'arrête / 带超时的 put，消费端退出时不挂死
+                    while not stop_event.is_set():
+                        try:
+                            records_q.put((prod_team_name, rec), timeout=1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop_event.is_set():
+                        return
+        finally:
+            records_q.put(_DONE)
+
+    producer = threading.Thread(target=_producer, daemon=True)
+    producer.start()
+
+    def _drain():
+        while True:
+            item = records_q.get()
+            if item is _DONE:
+                return
+            yield item
+
+    pending_rows = []  # Lot à charger via COPY / 待 COPY 批量写入的行
+    current_team = None
+
+    def _flush(team_label):
+        """Charge le lot courant via COPY et committe / COPY 写入当前批并提交"""
+        nonlocal total_records, executor
+        if not pending_rows:
+            return
+        # Pool de processus créé seulement si le volume le justifie
+        # 数据量足够大时才启动进程池
+        if executor is None and len(pending_rows) >= _COPY_BATCH_SIZE:
+            executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+        try:
+            rows = _build_physical_rows(pending_rows, executor)
+            total_records += _copy_physical_rows(cursor, rows)
+            conn.commit()
         except Exception as e:
-            print(f"  Error fetching physical data for {team_name}: {e}")
-            continue
-
-        if not physical_data:
-            continue
+            conn.rollback()
+            print(f"  Error bulk-loading physical data for {team_label}: {e}")
+        pending_rows.clear()
 
-        for record in physical_data:
-            sc_match_id = record.get('match_id') or record.get('match', {}).get('id')
-            sc_player_id = record.get('player_id') or record.get('player', {}).get('id')
+    try:
+        for team_name, record in _drain():
+            # Changement d'équipe : charger le reliquat de la précédente
+            # 切换球队时先落盘上一队的剩余批次
+            if current_team is not None and team_name != current_team:
+                _flush(current_team)
+            current_team = team_name
+            # Liaison locale de record.get : l'accès variable locale est bien
+            # plus rapide que la résolution d'attribut dans une boucle chaude.
+            # 绑定 record.get 到局部变量：热循环中局部变量访问远快于属性查找。
+            g = record.get
+            sc_match_id = g('match_id') or (g('match') or _EMPTY).get('id')
+            sc_player_id = g('player_id') or (g('player') or _EMPTY).get('id')
 
             if not sc_match_id or not sc_player_id:
                 continue
 
-            # Trouver le match_id interne
-            internal_match_id = None
-            cursor.execute(
-                f"SELECT match_id FROM {table('matches')} WHERE skillcorner_match_id = %s",
-                (sc_match_id,)
-            )
-            match_result = cursor.fetchone()
-            if match_result:
-                internal_match_id = match_result[0]
+            # Trouver le match_id interne / 内存字典解析内部 match_id
+            internal_match_id = sc_match_to_id.get(sc_match_id)
 
-            # Trouver le player_id interne
-            internal_player_id = None
-            cursor.execute(
-                f"SELECT player_id FROM {table('players')} WHERE skillcorner_player_id = %s",
-                (sc_player_id,),
-            )
-            player_result = cursor.fetchone()
-            if player_result:
-                internal_player_id = player_result[0]
-            else:
+            # Trouver le player_id interne / 内存字典解析内部 player_id
+            internal_player_id = sc_player_to_id.get(sc_player_id)
+            if internal_player_id is None and sc_player_id not in sc_player_unmapped:
                 # Tenter le match par nom depuis l'enregistrement physical (compléter le lien SC)
                 sc_player_name = (
-                    record.get("player_name")
-                    or record.get("player_short_name")
-                    or (record.get("player", {}) or {}).get("name")
+                    g("player_name")
+                    or g("player_short_name")
+                    or (g("player") or _EMPTY).get("name")
                 )
                 if sc_player_name:
                     for name_var in [
@@ -621,15 +1074,7 @@ def ingest_physical_data(conn, client, competition_edition_id):
                         if not name_var:
                             continue
                         cursor.execute(
-                            f"""
-                            SELECT player_id FROM {table('players')}
-                            WHERE (skillcorner_player_id IS NULL)
-                            AND (
-                                LOWER(player_name) = LOWER(%s)
-                                OR LOWER(statsbomb_player_name) = LOWER(%s)
-                                OR player_name LIKE %s
-                            )
-                            """,
+                            sql_backfill_find,
                             (name_var, name_var, f"%{name_var}%"),
                         )
                         match = cursor.fetchone()
@@ -638,151 +1083,40 @@ def ingest_physical_data(conn, client, competition_edition_id):
                             dob = record.get("player_birthdate")
                             pos = record.get("position") or record.get("position_group")
                             cursor.execute(
-                                f"""
-                                UPDATE {table('players')} SET
-                                    skillcorner_player_id = %s,
-                                    skillcorner_player_name = %s,
-                                    date_of_birth = COALESCE(date_of_birth, %s),
-                                    primary_position = COALESCE(primary_position, %s),
-                                    updated_at = NOW()
-                                WHERE player_id = %s AND skillcorner_player_id IS NULL
-                                """,
+                                sql_backfill_link,
                                 (sc_player_id, sc_player_name, dob, pos, match[0]),
                             )
                             internal_player_id = match[0]
+                            sc_player_to_id[sc_player_id] = match[0]
                             break
-
-            # Extraire les métriques physiques (noms de champs API SkillCorner - variantes multiples)
-            def get_metric(record, *keys):
-                for key in keys:
-                    val = record.get(key)
-                    if val is not None:
-                        return val
-                return None
-
-            raw_json = json.dumps(record, default=str)
-
-            # SkillCorner 2024+ utilise les suffixes *_full_all (ex. total_distance_full_all)
-            minutes = get_metric(
-                record, "minutes_full_all", "minutes_played", "minutes"
-            )
-            total_dist = get_metric(
-                record,
-                "total_distance_full_all",
-                "total_distance",
-                "distance_total",
-                "total_distance_m",
-            )
-            running_dist = get_metric(
-                record,
-                "running_distance_full_all",
-                "running_distance",
-                "distance_running",
-                "low_speed_running_distance",
-            )
-            hsr_dist = get_metric(
-                record,
-                "hsr_distance_full_all",
-                "high_speed_running_distance",
-                "distance_high_speed_running",
-                "hsr_distance",
-            )
-            sprint_dist = get_metric(
-                record,
-                "sprint_distance_full_all",
-                "sprinting_distance",
-                "distance_sprinting",
-                "sprint_distance",
-            )
-            sprint_count = get_metric(
+                if internal_player_id is None:
+                    # Mémoriser l'échec : pas de nouvelle tentative pour cet ID
+                    # 记录失败，后续记录不再重试该 ID
+                    sc_player_unmapped.add(sc_player_id)
+
+            # La partie CPU (métriques + JSON) est différée au flush du lot
+            # CPU 部分（指标提取 + JSON）推迟到批量落盘时执行
+            pending_rows.append((
+                internal_match_id,
+                internal_player_id,
+                sc_match_id,
+                sc_player_id,
+                team_name,
                 record,
-                "sprint_count_full_all",
-                "sprint_count",
-                "num_sprints",
-                "sprints",
-            )
-            hsr_count = get_metric(
-                record,
-                "hsr_count_full_all",
-                "high_speed_run_count",
-                "num_high_speed_runs",
-            )
-
-            try:
-                cursor.execute(f"""
-                    INSERT INTO {table('player_match_physical')}
-                    (match_id, player_id, skillcorner_match_id, skillcorner_player_id,
-                     team_name, minutes_played,
-                     total_distance_m, walking_distance_m, jogging_distance_m,
-                     running_distance_m, high_speed_running_m, sprinting_distance_m,
-                     max_speed_kmh, avg_speed_kmh, num_sprints, num_high_speed_runs,
-                     num_accelerations, num_decelerations, high_intensity_distance_m,
-                     distance_tip_m, distance_otip_m, psv99,
-                     raw_physical_json)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    internal_match_id,
-                    internal_player_id,
-                    sc_match_id,
-                    sc_player_id,
-                    team_name,
-                    minutes,
-                    total_dist,
-                    get_metric(record, "walking_distance", "distance_walking"),
-                    get_metric(record, "jogging_distance", "distance_jogging"),
-                    running_dist,
-                    hsr_dist,
-                    sprint_dist,
-                    get_metric(
-                        record,
-                        "top_speed", "max_speed", "peak_speed", "peak_velocity",
-                        "max_speed_kmh", "top_speed_kmh",
-                    ),
-                    get_metric(
-                        record,
-                        "average_speed", "avg_speed", "avg_speed_kmh",
-                        "mean_speed", "mean_velocity",
-                    ),
-                    sprint_count,
-                    hsr_count,
-                    get_metric(
-                        record,
-                        "acceleration_count", "num_accelerations",
-                        "accelerations", "acceleration_count_full_all",
-                        "num_accelerations_full_all", "explosive_accelerations",
-                    ),
-                    get_metric(
-                        record,
-                        "deceleration_count", "num_decelerations",
-                        "decelerations", "deceleration_count_full_all",
-                        "num_decelerations_full_all",
-                    ),
-                    get_metric(
-                        record,
-                        "high_intensity_distance",
-                        "hi_distance",
-                    ),
-                    get_metric(
-                        record,
-                        "distance_tip",
-                        "tip_distance",
-                        "distance_in_possession",
-                    ),
-                    get_metric(
-                        record,
-                        "distance_otip",
-                        "otip_distance",
-                        "distance_out_of_possession",
-                    ),
-                    get_metric(record, "psv_99", "psv99"),
-                    raw_json,
-                ))
-                total_records += 1
-            except Exception as e:
-                continue
+            ))
 
-        if total_records % 100 == 0:
-            conn.commit()
+            # Flush par lot : la mémoire reste bornée quelle que soit la
+            # taille de l'équipe / 按批落盘，内存与球队数据量无关
+            if len(pending_rows) >= _COPY_BATCH_SIZE:
+                _flush(team_name)
+
+        # Charger le reliquat / 剩余批次一次 COPY 写入
+        _flush(current_team or '')
+    finally:
+        stop_event.set()
+        producer.join(timeout=5)
+        if executor is not None:
+            executor.shutdown()
 
     conn.commit()
     print(f"Stored {total_records} physical data records")
@@ -13,16 +13,36 @@ Flux / 执行顺序 :
   → ingest_events → ingest_match_lineups → ingest_player_season_stats → update_player_info_from_mapping
 """
 
+import csv
+import io
 import json
+import pickle
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
+import requests
+from requests.auth import HTTPBasicAuth
+from psycopg2.extras import execute_values
 from statsbombpy import sb
 
+# Session persistante pour l'API player-mapping : keep-alive + réponse
+# compressée (le payload JSON peut être volumineux).
+# player-mapping API 的持久会话：keep-alive 并请求 gzip 压缩。
+_MAPPING_SESSION = requests.Session()
+_MAPPING_SESSION.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+# orjson (sérialisation JSON en Rust, 3-10× plus rapide) si disponible,
+# sinon json stdlib / 可选 orjson（Rust 实现，快 3-10 倍），缺失则用标准库 json
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import STATSBOMB_CREDS, STATSBOMB_COMPETITION_NAME, STATSBOMB_COUNTRY, INCREMENTAL_UPDATE
-from src.database import get_connection, table
+from src.database import get_connection, get_pool, table
 
 
 def _extract_name_or_id(obj):
@@ -106,33 +126,41 @@ def ingest_competitions(conn, comps_df=None):
 
     cursor = conn.cursor()
 
-    for _, row in comps_df.iterrows():
-        # Insérer la compétition
-        cursor.execute(f"""
-            INSERT INTO {table("competitions")} 
-            (competition_id, competition_name, country_name, competition_gender,
-             competition_youth, competition_international, source)
-            VALUES (%s, %s, %s, %s, %s, %s, 'statsbomb')
-            ON CONFLICT (competition_id) DO NOTHING
-        """, (
-            int(row['competition_id']),
-            row['competition_name'],
-            row.get('country_name', ''),
-            row.get('competition_gender', ''),
-            str(row.get('competition_youth', False)),
-            str(row.get('competition_international', False)),
-        ))
+    # Extraction colonne par colonne puis zip en tuples : évite iterrows
+    # (une Series boxée par ligne) et réduit l'insertion à deux ordres groupés.
+    # 逐列提取后 zip 成元组：避开 iterrows 的逐行 Series 装箱，两条批量语句入库。
+    def _col(name, default=None):
+        if name in comps_df.columns:
+            return comps_df[name].tolist()
+        return [default] * len(comps_df)
+
+    comp_rows = [
+        (int(cid), cname, cn or '', cg or '', str(cy), str(ci))
+        for cid, cname, cn, cg, cy, ci in zip(
+            _col('competition_id'), _col('competition_name'),
+            _col('country_name', ''), _col('competition_gender', ''),
+            _col('competition_youth', False),
+            _col('competition_international', False))
+    ]
+    season_rows = [
+        (int(sid), sname, int(cid))
+        for sid, sname, cid in zip(
+            _col('season_id'), _col('season_name'), _col('competition_id'))
+    ]
 
-        # Insérer la saison
-        cursor.execute(f"""
-            INSERT INTO {table("seasons")} (season_id, season_name, competition_id)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (season_id) DO NOTHING
-        """, (
-            int(row['season_id']),
-            row['season_name'],
-            int(row['competition_id'])
-        ))
+    execute_values(cursor, f"""
+        INSERT INTO {table("competitions")}
+        (competition_id, competition_name, country_name, competition_gender,
+         competition_youth, competition_international, source)
+        VALUES %s
+        ON CONFLICT (competition_id) DO NOTHING
+    """, comp_rows, template="(%s, %s, %s, %s, %s, %s, 'statsbomb')")
+
+    execute_values(cursor, f"""
+        INSERT INTO {table("seasons")} (season_id, season_name, competition_id)
+        VALUES %s
+        ON CONFLICT (season_id) DO NOTHING
+    """, season_rows)
 
     conn.commit()
     print(f"Stored {len(comps_df)} competition-season entries")
@@ -156,105 +184,96 @@ def get_matches(competition_id, season_id):
     return matches
 
 
+def _resolve_team_fields(raw_team, raw_sb_id, raw_country, raw_gender):
+    """Normalise (nom, statsbomb_id, pays, genre) d'une équipe API.
+    L'API renvoie home_team/away_team en objet {id, name} ou chaîne plate ;
+    statsbombpy peut aplatir. / 统一解析 API 队伍字段（对象或扁平列）。"""
+    name = _extract_name_or_id(raw_team) or str(raw_team or '')
+    sb_id = _extract_id(raw_team)
+    if sb_id is None and raw_sb_id is not None and pd.notna(raw_sb_id):
+        try:
+            sb_id = int(raw_sb_id)
+        except (TypeError, ValueError):
+            pass
+    country = _extract_name_or_id(raw_country) if isinstance(raw_country, dict) else str(raw_country or '')
+    return name, sb_id, country or '', raw_gender or ''
+
+
 def ingest_matches(conn, competition_id, season_id):
     """Fetch and store matches."""
     matches_df = get_matches(competition_id, season_id)
     cursor = conn.cursor()
-
-    for _, row in matches_df.iterrows():
-        sb_match_id = int(row['match_id'])
-
-        # L'API renvoie home_team/away_team en objet {id, name} ou chaîne plate ; statsbombpy peut aplatir
-        home_team_name = _extract_name_or_id(row.get('home_team')) or str(row.get('home_team', '') or '')
-        home_team_sb_id = _extract_id(row.get('home_team'))
-        if home_team_sb_id is None and 'home_team_id' in row and pd.notna(row.get('home_team_id')):
-            try:
-                home_team_sb_id = int(row['home_team_id'])
-            except (TypeError, ValueError):
-                pass
-        htc = row.get('home_team_country')
-        home_team_country = _extract_name_or_id(htc) if isinstance(htc, dict) else str(htc or '')
-        home_team_gender = row.get('home_team_gender', '')
-
-        cursor.execute(f"""
-            INSERT INTO {table("teams")} (team_name, statsbomb_team_id, country, gender)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (team_name) DO UPDATE SET
-                statsbomb_team_id = COALESCE({table("teams")}.statsbomb_team_id, EXCLUDED.statsbomb_team_id)
-        """, (
-            home_team_name,
-            home_team_sb_id,
-            home_team_country or '',
-            home_team_gender or ''
-        ))
-
-        cursor.execute(f"SELECT team_id FROM {table('teams')} WHERE team_name = %s", (home_team_name,))
-        home_team_result = cursor.fetchone()
-        home_team_id = home_team_result[0] if home_team_result else None
-
-        if home_team_id and home_team_sb_id:
-            cursor.execute(f"""
-                UPDATE {table("teams")} SET statsbomb_team_id = %s WHERE team_id = %s AND statsbomb_team_id IS NULL
-            """, (home_team_sb_id, home_team_id))
-
-        away_team_name = _extract_name_or_id(row.get('away_team')) or str(row.get('away_team', '') or '')
-        away_team_sb_id = _extract_id(row.get('away_team'))
-        if away_team_sb_id is None and 'away_team_id' in row and pd.notna(row.get('away_team_id')):
-            try:
-                away_team_sb_id = int(row['away_team_id'])
-            except (TypeError, ValueError):
-                pass
-        atc = row.get('away_team_country')
-        away_team_country = _extract_name_or_id(atc) if isinstance(atc, dict) else str(atc or '')
-        away_team_gender = row.get('away_team_gender', '')
-
-        cursor.execute(f"""
-            INSERT INTO {table("teams")} (team_name, statsbomb_team_id, country, gender)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (team_name) DO UPDATE SET
-                statsbomb_team_id = COALESCE({table("teams")}.statsbomb_team_id, EXCLUDED.statsbomb_team_id)
-        """, (
-            away_team_name,
-            away_team_sb_id,
-            away_team_country or '',
-            away_team_gender or ''
+    teams_tbl = table("teams")
+
+    # Colonnes extraites une fois en listes Python (pas de Series par ligne,
+    # iterrows est 1 à 2 ordres de grandeur plus lent que le zip de colonnes).
+    # 逐列取出为 Python 列表后 zip，不再用 iterrows 逐行装箱 Series。
+    def _col(name, default=None):
+        if name in matches_df.columns:
+            return matches_df[name].tolist()
+        return [default] * len(matches_df)
+
+    # Première passe : résoudre les champs équipe et préparer les lignes match
+    # 第一遍：解析队伍字段并准备比赛行
+    team_rows = {}      # nom -> (nom, sb_id, pays, genre), dédupliqué par nom
+    prepared = []
+    for (mid, h, h_id, h_ctry, h_gen, a, a_id, a_ctry, a_gen,
+         mdate, kick, hs, as_, stadium, ref, ref_name, week, status) in zip(
+            _col('match_id'), _col('home_team'), _col('home_team_id'),
+            _col('home_team_country'), _col('home_team_gender', ''),
+            _col('away_team'), _col('away_team_id'),
+            _col('away_team_country'), _col('away_team_gender', ''),
+            _col('match_date', ''), _col('kick_off', ''),
+            _col('home_score'), _col('away_score'),
+            _col('stadium'), _col('referee'), _col('referee_name'),
+            _col('match_week'), _col('match_status', '')):
+        home = _resolve_team_fields(h, h_id, h_ctry, h_gen)
+        away = _resolve_team_fields(a, a_id, a_ctry, a_gen)
+        for t in (home, away):
+            prev = team_rows.get(t[0])
+            # Garder le premier statsbomb_team_id non nul / 保留首个非空 sb_id
+            if prev is None or (prev[1] is None and t[1] is not None):
+                team_rows[t[0]] = t
+        prepared.append((
+            int(mid), home[0], away[0], str(mdate or ''), str(kick or ''),
+            int(hs) if pd.notna(hs) else None,
+            int(as_) if pd.notna(as_) else None,
+            _extract_name_or_id(stadium),
+            _extract_name_or_id(ref) or _extract_name_or_id(ref_name),
+            int(week) if pd.notna(week) else None,
+            status,
         ))
 
-        cursor.execute(f"SELECT team_id FROM {table('teams')} WHERE team_name = %s", (away_team_name,))
-        away_team_result = cursor.fetchone()
-        away_team_id = away_team_result[0] if away_team_result else None
-
-        if away_team_id and away_team_sb_id:
-            cursor.execute(f"""
-                UPDATE {table("teams")} SET statsbomb_team_id = %s WHERE team_id = %s AND statsbomb_team_id IS NULL
-            """, (away_team_sb_id, away_team_id))
-
-        stadium_name = _extract_name_or_id(row.get('stadium'))
-        referee_name = _extract_name_or_id(row.get('referee')) or _extract_name_or_id(row.get('referee_name'))
-
-        # Insérer le match
-        cursor.execute(f"""
-            INSERT INTO {table("matches")} 
-            (statsbomb_match_id, competition_id, season_id, match_date, kick_off,
-             home_team_id, away_team_id, home_score, away_score, stadium, referee,
-             match_week, match_status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (statsbomb_match_id) DO NOTHING
-        """, (
-            sb_match_id,
-            competition_id,
-            season_id,
-            str(row.get('match_date', '')),
-            str(row.get('kick_off', '')),
-            home_team_id,
-            away_team_id,
-            int(row['home_score']) if pd.notna(row.get('home_score')) else None,
-            int(row['away_score']) if pd.notna(row.get('away_score')) else None,
-            stadium_name,
-            referee_name,
-            int(row['match_week']) if pd.notna(row.get('match_week')) else None,
-            row.get('match_status', '')
-        ))
+    # Upsert groupé des équipes avec RETURNING : un seul aller-retour rend
+    # aussi le dict nom -> team_id (DO UPDATE renvoie les lignes en conflit,
+    # contrairement à DO NOTHING). Dédupliqué : ON CONFLICT DO UPDATE refuse
+    # deux fois la même ligne dans un même ordre.
+    # 批量 upsert 队伍并 RETURNING：一次往返同时拿到 名称 -> team_id 映射
+    # （DO UPDATE 会返回冲突行）；已按名去重。
+    returned = execute_values(cursor, f"""
+        INSERT INTO {teams_tbl} (team_name, statsbomb_team_id, country, gender)
+        VALUES %s
+        ON CONFLICT (team_name) DO UPDATE SET
+            statsbomb_team_id = COALESCE({teams_tbl}.statsbomb_team_id, EXCLUDED.statsbomb_team_id)
+        RETURNING team_name, team_id
+    """, list(team_rows.values()), fetch=True)
+    team_id_by_name = dict(returned)
+
+    match_rows = [
+        (mid, competition_id, season_id, mdate, kick,
+         team_id_by_name.get(hname), team_id_by_name.get(aname),
+         hs, as_, stadium, ref, week, status)
+        for (mid, hname, aname, mdate, kick, hs, as_,
+             stadium, ref, week, status) in prepared
+    ]
+    execute_values(cursor, f"""
+        INSERT INTO {table("matches")}
+        (statsbomb_match_id, competition_id, season_id, match_date, kick_off,
+         home_team_id, away_team_id, home_score, away_score, stadium, referee,
+         match_week, match_status)
+        VALUES %s
+        ON CONFLICT (statsbomb_match_id) DO NOTHING
+    """, match_rows, page_size=200)
 
     conn.commit()
     print(f" Stored {len(matches_df)} matches")
@@ -266,16 +285,71 @@ def ingest_matches(conn, competition_id, season_id):
 # 4. 事件入库（events 表：传球、射门、带球等）
 # ============================================================
 
-def get_events(match_id):
+# Cache disque des réponses API par match : les events/lineups d'un match
+# joué ne changent plus, une relance d'ingestion interrompue ne repaie donc
+# pas le réseau. Surcharger via SB_API_CACHE_DIR, forcer avec force=True.
+# 按比赛缓存 API 响应：已踢比赛的数据不再变化，重跑免去网络开销；
+# 目录可用 SB_API_CACHE_DIR 覆盖，force=True 强制重新拉取。
+_API_CACHE_DIR = os.environ.get(
+    "SB_API_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                 "data_cache", "statsbomb"),
+)
+
+
+def _api_cache_get(kind, match_id):
+    """Relit une réponse mise en cache, None si absente/illisible."""
+    try:
+        with open(os.path.join(_API_CACHE_DIR, kind, f"{int(match_id)}.pkl"), "rb") as fh:
+            return pickle.load(fh)
+    except Exception:
+        return None
+
+
+def _api_cache_put(kind, match_id, obj):
+    """Écrit une réponse dans le cache (meilleur effort, écriture atomique)."""
+    path = os.path.join(_API_CACHE_DIR, kind, f"{int(match_id)}.pkl")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(obj, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+
+def get_events(match_id, force=False):
     """Fetch all events for a single match. Returns empty DataFrame if no events (API returns empty)."""
+    if not force:
+        cached = _api_cache_get("events", match_id)
+        if cached is not None:
+            return cached
     try:
         events = sb.events(match_id=match_id, creds=STATSBOMB_CREDS)
-        return events if events is not None and not (hasattr(events, 'empty') and events.empty) else pd.DataFrame()
+        events = events if events is not None and not (hasattr(events, 'empty') and events.empty) else pd.DataFrame()
     except (ValueError, Exception) as e:
         # statsbombpy lève ValueError("No objects to concatenate") si le match n'a pas d'events
         if "No objects to concatenate" in str(e) or "No objects" in str(e):
             return pd.DataFrame()
         raise
+    # Ne pas mettre en cache un DataFrame vide : un match pas encore publié
+    # resterait épinglé vide pour toujours (le cache n'a pas de TTL).
+    if not events.empty:
+        _api_cache_put("events", match_id, events)
+    return events
+
+
+def get_lineups(match_id, force=False):
+    """Fetch lineups (dict) for a single match, with the same disk cache."""
+    if not force:
+        cached = _api_cache_get("lineups", match_id)
+        if cached is not None:
+            return cached
+    lineups = sb.lineups(match_id=match_id, fmt="dict", creds=STATSBOMB_CREDS)
+    if lineups:
+        _api_cache_put("lineups", match_id, lineups)
+    return lineups
 
 
 def _has_val(val):
@@ -325,29 +399,302 @@ def _to_pg_val(val):
     return val
 
 
+def _scalar(val, default=None):
+    """Accès sécurisé à un scalaire de colonne (NaN/array → default).
+    安全取标量：NaN 或空 numpy 数组返回 default。"""
+    if val is None:
+        return default
+    if isinstance(val, float) and pd.isna(val):
+        return default
+    if isinstance(val, np.ndarray):
+        if val.size == 0:
+            return default
+        return val.item() if val.size == 1 else default
+    return val
+
+
+def _split_xy_column(col, n):
+    """Éclate une colonne de paires [x, y] en deux tableaux float (NaN si absent).
+
+    Une passe vectorisée (masque + np.vstack) par colonne remplace les tests
+    isinstance et casts float répétés à chaque event ; _to_pg_val convertit
+    ensuite les NaN en NULL.
+    向量化拆分坐标列：掩码 + np.vstack 一次完成，NaN 由 _to_pg_val 转为 NULL。
+    """
+    mask = np.fromiter(
+        (isinstance(v, (list, tuple, np.ndarray)) and len(v) >= 2 for v in col),
+        dtype=bool, count=n)
+    xs = np.full(n, np.nan)
+    ys = np.full(n, np.nan)
+    if mask.any():
+        pairs = np.vstack([np.asarray(v[:2], dtype=float) for v in col[mask]])
+        xs[mask] = pairs[:, 0]
+        ys[mask] = pairs[:, 1]
+    return xs, ys
+
+
+# Colonnes sources lues dans le DataFrame d'events (accès par colonne, voir
+# ingest_events) / ingest_events 按列读取的源字段
+_NEEDED_EVENT_COLS = (
+    'id', 'index', 'period', 'timestamp', 'minute', 'second', 'type',
+    'type_id', 'possession', 'possession_team', 'play_pattern', 'team',
+    'player', 'player_id', 'position', 'location', 'duration',
+    'under_pressure', 'pass_recipient_id', 'pass_length', 'pass_angle',
+    'pass_height', 'pass_end_location', 'pass_outcome', 'pass_type',
+    'pass_body_part', 'pass_cross', 'shot_statsbomb_xg', 'shot_end_location',
+    'shot_outcome', 'shot_technique', 'shot_body_part', 'shot_type',
+    'shot_first_time', 'carry_end_location', 'dribble_outcome',
+    'obv_total_net', 'obv_for_net', 'obv_against_net',
+)
+
+
+# Ordres SQL des boucles chaudes, résolus une fois à l'import : table() et le
+# f-string ne sont plus reconstruits à chaque exécution.
+# 热循环 SQL 在导入时一次性生成，循环内不再重建 table() 与 f-string。
+_SQL_INSERT_PLAYER = f"""
+    INSERT INTO {table("players")}
+    (statsbomb_player_id, statsbomb_player_name, player_name)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (statsbomb_player_id) DO NOTHING
+"""
+_SQL_SELECT_PLAYER_BY_SB_ID = (
+    f"SELECT player_id FROM {table('players')} WHERE statsbomb_player_id = %s"
+)
+_SQL_LINK_TEAM_SB_ID = (
+    f"UPDATE {table('teams')} SET statsbomb_team_id = %s "
+    f"WHERE team_id = %s AND statsbomb_team_id IS NULL"
+)
+_SQL_SELECT_TEAM_BY_NAME = (
+    f"SELECT team_id FROM {table('teams')} WHERE team_name = %s"
+)
+# Le DO UPDATE « no-op » force RETURNING à renvoyer aussi les lignes en
+# conflit (DO NOTHING ne renvoie que les insertions neuves) : le cache est
+# complet même si un autre connexion du pool vient d'insérer le joueur.
+# 无实质变化的 DO UPDATE 让 RETURNING 同时返回冲突行（DO NOTHING 只返回新行），
+# 并发插入下缓存也能完整回填。
+_SQL_BULK_INSERT_PLAYERS = f"""
+    INSERT INTO {table("players")}
+    (statsbomb_player_id, statsbomb_player_name, player_name)
+    VALUES %s
+    ON CONFLICT (statsbomb_player_id) DO UPDATE
+        SET statsbomb_player_name = EXCLUDED.statsbomb_player_name
+    RETURNING statsbomb_player_id, player_id
+"""
+
+
+def _tune_session_for_bulk_load(conn, cursor):
+    """Réglages de session pour le chargement en masse (meilleur effort).
+
+    synchronous_commit=off : le COMMIT n'attend plus le fsync WAL — en cas de
+    crash serveur on peut perdre les toutes dernières transactions, acceptable
+    ici car la reprise est idempotente (ON CONFLICT). work_mem/temp_buffers
+    aident les INSERT ... SELECT depuis le staging et la table temporaire.
+    SET simple (portée session) et non SET LOCAL : les réglages doivent
+    survivre aux COMMIT intermédiaires.
+    批量加载的会话调优（尽力而为）：synchronous_commit=off 免去每次提交的
+    WAL fsync（重跑幂等，可接受）；work_mem/temp_buffers 加速 staging 路径；
+    用会话级 SET 以跨越中途 COMMIT。
+    """
+    try:
+        cursor.execute("SET synchronous_commit = off")
+        cursor.execute("SET work_mem = '256MB'")
+        cursor.execute("SET temp_buffers = '128MB'")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+
+
+def _drop_secondary_event_indexes(conn, cursor):
+    """Dépose les index secondaires d'events avant le chargement en masse.
+
+    Chaque INSERT met à jour tous les index de la table ; les reconstruire en
+    une passe après le chargement est bien plus rapide. Les index UNIQUE
+    (PK et contrainte sur event_id, requise par ON CONFLICT) sont conservés.
+    Meilleur effort : renvoie les indexdef à recréer, [] si rien n'a bougé.
+    批量加载前卸下 events 的二级索引（保留 UNIQUE/PK，ON CONFLICT 需要），
+    加载后一次性重建更快；尽力而为，返回待重建的 indexdef。
+    """
+    dropped = []
+    try:
+        cursor.execute(
+            "SELECT schemaname, indexname, indexdef FROM pg_indexes "
+            "WHERE (schemaname || '.' || tablename) = %s "
+            "AND indexdef NOT ILIKE '%%unique%%'",
+            (table('events'),)
+        )
+        for schemaname, indexname, indexdef in cursor.fetchall():
+            cursor.execute(f'DROP INDEX {schemaname}.{indexname}')
+            dropped.append(indexdef)
+        conn.commit()
+        if dropped:
+            print(f"   Dropped {len(dropped)} secondary event indexes for bulk load")
+    except Exception:
+        conn.rollback()
+        dropped = []
+    return dropped
+
+
+def _recreate_event_indexes(conn, cursor, indexdefs):
+    """Recrée les index déposés par _drop_secondary_event_indexes.
+    重建批量加载前卸下的索引（逐个尽力而为）。"""
+    for indexdef in indexdefs:
+        try:
+            cursor.execute(indexdef)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+    if indexdefs:
+        print(f"   Recreated {len(indexdefs)} event indexes after bulk load")
+
+
+# Taille de lot pour l'insertion des events / events 批量插入的批大小
+_EVENT_BATCH_SIZE = 1000
+
+# Matchs entre deux COMMIT : chaque commit coûte un fsync WAL + un
+# aller-retour ; ON CONFLICT rend la reprise idempotente, on peut donc
+# espacer les points de contrôle.
+# 两次 COMMIT 之间的比赛数：每次提交都有 WAL fsync 与往返开销，
+# ON CONFLICT 保证重跑幂等，检查点可以拉开。
+_COMMIT_EVERY = 100
+
+# Threads de fetch API et fenêtre de préchargement / API 拉取线程数与预取窗口
+_FETCH_WORKERS = 8
+_FETCH_CHUNK = 20
+
+
+def _parallel_fetch(fetch_fn, ids, max_workers=_FETCH_WORKERS, chunk_size=_FETCH_CHUNK):
+    """Précharge fetch_fn(id) via un pool de threads, rend les résultats dans l'ordre.
+
+    Le goulot est la latence réseau de l'API StatsBomb ; les threads masquent
+    les allers-retours pendant que le thread principal écrit en base (curseur
+    psycopg2 non partageable). Travaille par tranches de chunk_size pour
+    borner le nombre de DataFrames en vol.
+    线程池并行预取，按原顺序产出；DB 写入仍在主线程（psycopg2 游标不可跨线程）。
+    按 chunk_size 分片以限制同时驻留内存的响应数。
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for start in range(0, len(ids), chunk_size):
+            yield from pool.map(fetch_fn, ids[start:start + chunk_size])
+
+# Colonnes remplies par l'ingestion des events, dans l'ordre des tuples
+# events 入库列（与行元组顺序一致）
+_EVENT_COLUMNS = (
+    "event_id", "match_id", "index_num", "period", "timestamp", "minute",
+    "second", "event_type", "event_type_id", "possession",
+    "possession_team_id", "play_pattern", "team_id", "player_id", "position",
+    "location_x", "location_y", "duration", "under_pressure",
+    "pass_recipient_id", "pass_length", "pass_angle", "pass_height",
+    "pass_end_location_x", "pass_end_location_y", "pass_outcome",
+    "pass_type", "pass_body_part", "pass_cross",
+    "shot_statsbomb_xg", "shot_end_location_x", "shot_end_location_y",
+    "shot_outcome", "shot_technique", "shot_body_part", "shot_type",
+    "shot_first_time",
+    "carry_end_location_x", "carry_end_location_y",
+    "dribble_outcome",
+    "obv_total_net", "obv_for_net", "obv_against_net",
+)
+
+
 def ingest_events(conn, matches_df, max_matches=None):
     """Fetch and store events for all matches."""
     cursor = conn.cursor()
+    _tune_session_for_bulk_load(conn, cursor)
     total_events = 0
     insert_errors_logged = 0
 
+    event_cols = ", ".join(_EVENT_COLUMNS)
+
+    # Chemin principal : COPY CSV vers une table de staging temporaire puis
+    # INSERT ... SELECT ... ON CONFLICT — le chargement le plus rapide côté
+    # Postgres (pas de parse/plan par ligne), l'upsert reste idempotent.
+    # 主路径：COPY CSV 进临时 staging 表，再 INSERT ... SELECT ... ON CONFLICT，
+    # 兼顾最快加载与幂等。
+    cursor.execute(
+        f"CREATE TEMP TABLE events_stage "
+        f"(LIKE {table('events')} INCLUDING DEFAULTS)"
+    )
+    # Commit immédiat : un rollback ultérieur ne doit pas emporter le staging
+    # 立即提交：后续回滚不应连带撤销 staging 表
+    conn.commit()
+    sql_copy_stage = (
+        f"COPY events_stage ({event_cols}) FROM STDIN WITH (FORMAT csv)"
+    )
+    sql_stage_to_events = f"""
+        INSERT INTO {table("events")} ({event_cols})
+        SELECT {event_cols} FROM events_stage
+        ON CONFLICT (event_id) DO NOTHING
+    """
+    # Repli ligne à ligne si un lot échoue / 整批失败时的逐行回退语句
+    sql_insert_events = f"""
+        INSERT INTO {table("events")} ({event_cols})
+        VALUES %s
+        ON CONFLICT (event_id) DO NOTHING
+    """
+    event_rows = []
+
+    def _flush_events():
+        """Charge le lot courant via COPY ; repli ligne à ligne si échec.
+        COPY 批量写入当前事件；整批失败时逐行回退以保留合法事件。"""
+        nonlocal total_events, insert_errors_logged
+        if not event_rows:
+            return
+        try:
+            buf = io.StringIO()
+            csv.writer(buf).writerows(event_rows)
+            buf.seek(0)
+            # Champ vide non quoté = NULL / CSV 空字段即 NULL
+            cursor.copy_expert(sql_copy_stage, buf)
+            cursor.execute(sql_stage_to_events)
+            cursor.execute("TRUNCATE events_stage")
+            total_events += len(event_rows)
+        except Exception:
+            conn.rollback()
+            # Un event mal formé ne doit pas faire perdre tout le lot
+            # 个别坏事件不应拖累整批
+            for row in event_rows:
+                try:
+                    execute_values(cursor, sql_insert_events, [row])
+                    total_events += 1
+                except Exception as e:
+                    conn.rollback()
+                    if insert_errors_logged < 3:
+                        insert_errors_logged += 1
+                        print(f"   ⚠️  Event insert error #{insert_errors_logged} (event_id={str(row[0])[:24]}...): {e}")
+        event_rows.clear()
+
+    # Caches de résolution d'ids : ces correspondances sont stables sur la
+    # durée du run ; trois SELECT initiaux remplacent jusqu'à 4 requêtes par
+    # event (équipe, équipe en possession, joueur, match).
+    # id 解析缓存：整个运行期间映射稳定，三次预查询替代每事件最多 4 次 SELECT。
+    cursor.execute(f"SELECT team_name, team_id FROM {table('teams')}")
+    team_cache = dict(cursor.fetchall())
+    cursor.execute(
+        f"SELECT statsbomb_player_id, player_id FROM {table('players')} "
+        f"WHERE statsbomb_player_id IS NOT NULL"
+    )
+    player_cache = dict(cursor.fetchall())
+    cursor.execute(
+        f"SELECT statsbomb_match_id, match_id FROM {table('matches')} "
+        f"WHERE statsbomb_match_id IS NOT NULL"
+    )
+    match_cache = dict(cursor.fetchall())
+
     match_ids = matches_df['match_id'].tolist()
     if max_matches:
         match_ids = match_ids[:max_matches]
 
     if INCREMENTAL_UPDATE:
-        # Ignorer les matchs pour lesquels on a déjà des events
-        to_fetch = []
-        for sb_mid in match_ids:
-            cursor.execute(
-                f"SELECT 1 FROM {table('events')} e "
-                f"JOIN {table('matches')} m ON e.match_id = m.match_id "
-                f"WHERE m.statsbomb_match_id = %s LIMIT 1",
-                (int(sb_mid),)
-            )
-            if cursor.fetchone() is None:
-                to_fetch.append(sb_mid)
-        match_ids = to_fetch
+        # Ignorer les matchs pour lesquels on a déjà des events — une seule
+        # requête ensembliste au lieu d'un SELECT par match
+        # 一次集合查询找出已有 events 的比赛，替代逐场探测
+        cursor.execute(
+            f"SELECT DISTINCT m.statsbomb_match_id FROM {table('events')} e "
+            f"JOIN {table('matches')} m ON e.match_id = m.match_id "
+            f"WHERE m.statsbomb_match_id = ANY(%s)",
+            ([int(m) for m in match_ids],)
+        )
+        already = {r[0] for r in cursor.fetchall()}
+        match_ids = [m for m in match_ids if int(m) not in already]
         if not match_ids:
             print("📡 All matches already have events (INCREMENTAL_UPDATE), skipping.")
             return 0
@@ -355,212 +702,199 @@ def ingest_events(conn, matches_df, max_matches=None):
     else:
         print(f"📡 Fetching events for {len(match_ids)} matches...")
 
-    for i, sb_match_id in enumerate(match_ids):
+    def _fetch_events_safe(mid):
         try:
-            events_df = get_events(int(sb_match_id))
-            if events_df.empty:
-                continue
+            return mid, get_events(int(mid)), None
+        except Exception as e:
+            return mid, None, e
 
-            # Obtenir le match_id interne
-            cursor.execute(
-                f"SELECT match_id FROM {table('matches')} WHERE statsbomb_match_id = %s",
-                (int(sb_match_id),)
-            )
-            result = cursor.fetchone()
-            if not result:
+    # Index secondaires suspendus pendant le chargement, recréés dans le
+    # finally même si la boucle échoue / 二级索引装载期间卸下，finally 中重建
+    dropped_indexes = _drop_secondary_event_indexes(conn, cursor) if match_ids else []
+    try:
+        for i, (sb_match_id, events_df, fetch_err) in enumerate(
+                _parallel_fetch(_fetch_events_safe, match_ids)):
+            if fetch_err is not None:
+                print(f"   ⚠️  Error fetching events for match {sb_match_id}: {fetch_err}")
                 continue
-            internal_match_id = result[0]
-
-            for _, evt in events_df.iterrows():
-                # Obtenir l'id joueur interne (ou insérer le joueur)
-                player_internal_id = None
-                sb_player_id = None
-                player_name = None
-
-                if _has_val(evt.get('player')) and _has_val(evt.get('player_id')):
-                    sb_player_id = int(evt['player_id'])
-                    player_name = str(evt['player'])
-
-                    # Chercher un joueur existant
-                    cursor.execute(
-                        f"SELECT player_id FROM {table('players')} WHERE statsbomb_player_id = %s",
-                        (sb_player_id,)
-                    )
-                    player_result = cursor.fetchone()
-                    if player_result:
-                        player_internal_id = player_result[0]
-                    else:
-                        # Insérer le nouveau joueur
-                        cursor.execute(f"""
-                            INSERT INTO {table("players")} 
-                            (statsbomb_player_id, statsbomb_player_name, player_name)
-                            VALUES (%s, %s, %s)
-                            ON CONFLICT (statsbomb_player_id) DO NOTHING
-                        """, (sb_player_id, player_name, player_name))
-                        cursor.execute(
-                            f"SELECT player_id FROM {table('players')} WHERE statsbomb_player_id = %s",
-                            (sb_player_id,)
-                        )
-                        player_result = cursor.fetchone()
-                        if player_result:
-                            player_internal_id = player_result[0]
-
-                # Extraire la position (gérer list/tuple/np.ndarray - éviter pd.notna sur les arrays)
-                location_x, location_y = None, None
-                loc = evt.get('location')
-                if _has_val(loc):
-                    if isinstance(loc, (list, tuple, np.ndarray)) and len(loc) >= 2:
-                        location_x, location_y = float(loc[0]), float(loc[1])
-
-                # Extraire les détails de passe
-                pass_end_x, pass_end_y = None, None
-                pel = evt.get('pass_end_location')
-                if _has_val(pel):
-                    if isinstance(pel, (list, tuple, np.ndarray)) and len(pel) >= 2:
-                        pass_end_x, pass_end_y = float(pel[0]), float(pel[1])
-
-                pass_recipient_id = None
-                if _has_val(evt.get('pass_recipient_id')):
-                    pass_recipient_id = int(evt['pass_recipient_id'])
-
-                # Extraire les détails de tir
-                shot_end_x, shot_end_y = None, None
-                sel = evt.get('shot_end_location')
-                if _has_val(sel):
-                    if isinstance(sel, (list, tuple, np.ndarray)) and len(sel) >= 2:
-                        shot_end_x, shot_end_y = float(sel[0]), float(sel[1])
-
-                # Extraire les détails de conduite
-                carry_end_x, carry_end_y = None, None
-                cel = evt.get('carry_end_location')
-                if _has_val(cel):
-                    if isinstance(cel, (list, tuple, np.ndarray)) and len(cel) >= 2:
-                        carry_end_x, carry_end_y = float(cel[0]), float(cel[1])
-
-                # Obtenir team_id
-                team_internal_id = None
-                if _has_val(evt.get('team')):
-                    cursor.execute(
-                        f"SELECT team_id FROM {table('teams')} WHERE team_name = %s",
-                        (str(evt['team']),)
-                    )
-                    team_result = cursor.fetchone()
-                    if team_result:
-                        team_internal_id = team_result[0]
-
-                # Obtenir l'id équipe en possession
-                poss_team_id = None
-                if _has_val(evt.get('possession_team')):
-                    cursor.execute(
-                        f"SELECT team_id FROM {table('teams')} WHERE team_name = %s",
-                        (str(evt['possession_team']),)
-                    )
-                    poss_result = cursor.fetchone()
-                    if poss_result:
-                        poss_team_id = poss_result[0]
-
-                # Accès sécurisé aux champs optionnels (évite array/Series en contexte booléen)
-                def safe_get(col, default=None):
-                    val = evt.get(col)
-                    if val is None:
-                        return default
-                    if isinstance(val, float) and pd.isna(val):
-                        return default
-                    if isinstance(val, np.ndarray):
-                        if val.size == 0:
-                            return default
-                        return val.item() if val.size == 1 else default
-                    return val
-
-                # L'event_id doit être valide (chaîne UUID StatsBomb)
-                event_id_val = evt.get('id')
-                if not _has_val(event_id_val):
+            try:
+                if events_df.empty:
                     continue
-                event_id_str = str(event_id_val)
 
-                try:
-                    cursor.execute(f"""
-                        INSERT INTO {table("events")} 
-                        (event_id, match_id, index_num, period, timestamp, minute, second,
-                         event_type, event_type_id, possession, possession_team_id,
-                         play_pattern, team_id, player_id, position,
-                         location_x, location_y, duration, under_pressure,
-                         pass_recipient_id, pass_length, pass_angle, pass_height,
-                         pass_end_location_x, pass_end_location_y, pass_outcome,
-                         pass_type, pass_body_part, pass_cross,
-                         shot_statsbomb_xg, shot_end_location_x, shot_end_location_y,
-                         shot_outcome, shot_technique, shot_body_part, shot_type,
-                         shot_first_time,
-                         carry_end_location_x, carry_end_location_y,
-                         dribble_outcome,
-                         obv_total_net, obv_for_net, obv_against_net)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                                %s, %s, %s, %s, %s)
-                        ON CONFLICT (event_id) DO NOTHING
-                    """, (
-                        event_id_str,
-                        internal_match_id,
-                        _to_pg_val(safe_get('index')),
-                        _to_pg_val(safe_get('period')),
-                        safe_get('timestamp'),  # str
-                        _to_pg_val(safe_get('minute')),
-                        _to_pg_val(safe_get('second')),
-                        safe_get('type'),  # str
-                        _to_pg_val(safe_get('type_id')),
-                        _to_pg_val(safe_get('possession')),
-                        poss_team_id,
-                        safe_get('play_pattern'),  # str
-                        team_internal_id,
-                        player_internal_id,
-                        safe_get('position'),  # str
-                        _to_pg_val(location_x),
-                        _to_pg_val(location_y),
-                        _to_pg_val(safe_get('duration')),
-                        _to_pg_bool(safe_get('under_pressure')),
-                        pass_recipient_id,
-                        _to_pg_val(safe_get('pass_length')),
-                        _to_pg_val(safe_get('pass_angle')),
-                        safe_get('pass_height'),  # str
-                        _to_pg_val(pass_end_x),
-                        _to_pg_val(pass_end_y),
-                        safe_get('pass_outcome'),
-                        safe_get('pass_type'),
-                        safe_get('pass_body_part'),
-                        _to_pg_bool(safe_get('pass_cross')),
-                        _to_pg_val(safe_get('shot_statsbomb_xg')),
-                        _to_pg_val(shot_end_x),
-                        _to_pg_val(shot_end_y),
-                        safe_get('shot_outcome'),
-                        safe_get('shot_technique'),
-                        safe_get('shot_body_part'),
-                        safe_get('shot_type'),
-                        _to_pg_bool(safe_get('shot_first_time')),
-                        _to_pg_val(carry_end_x),
-                        _to_pg_val(carry_end_y),
-                        safe_get('dribble_outcome'),
-                        _to_pg_val(safe_get('obv_total_net')),
-                        _to_pg_val(safe_get('obv_for_net')),
-                        _to_pg_val(safe_get('obv_against_net')),
-                    ))
-                except Exception as e:
-                    # Logger quelques échecs pour debug ; ignorer les events individuels en erreur
-                    if insert_errors_logged < 3:
-                        insert_errors_logged += 1
-                        print(f"   ⚠️  Event insert error #{insert_errors_logged} (event_id={event_id_str[:24]}...): {e}")
+                # Obtenir le match_id interne (cache)
+                internal_match_id = match_cache.get(int(sb_match_id))
+                if internal_match_id is None:
                     continue
 
-                total_events += 1
+                # Accès orienté colonne (SoA) : chaque colonne utile est extraite
+                # une fois en tableau numpy, puis indexée par position — évite la
+                # Series boxée par ligne de iterrows et l'indexation par label de
+                # .get(). Les colonnes absentes partagent un tableau de None.
+                # 列式访问（SoA）：各列一次性取为 numpy 数组后按下标读取，
+                # 避开 iterrows 的逐行 Series 与标签索引；缺失列共享 None 数组。
+                n_events = len(events_df)
+                none_col = np.full(n_events, None, dtype=object)
+                arrs = {
+                    c: (events_df[c].to_numpy() if c in events_df.columns else none_col)
+                    for c in _NEEDED_EVENT_COLS
+                }
+
+                # Paires [x, y] éclatées en colonnes float une fois par match
+                # 每场比赛一次性拆分各坐标列
+                loc_x, loc_y = _split_xy_column(arrs['location'], n_events)
+                pel_x, pel_y = _split_xy_column(arrs['pass_end_location'], n_events)
+                sel_x, sel_y = _split_xy_column(arrs['shot_end_location'], n_events)
+                cel_x, cel_y = _split_xy_column(arrs['carry_end_location'], n_events)
+
+                # Pré-passe joueurs : un seul upsert groupé des joueurs du
+                # match absents du cache, au lieu d'INSERT + SELECT par
+                # nouveau joueur au fil des events. RETURNING ne renvoie que
+                # les lignes réellement insérées — les autres sont déjà dans
+                # player_cache ; la voie lente en boucle reste en filet.
+                # 球员预处理：整场未知球员一次批量 upsert，RETURNING 回填缓存，
+                # 循环内的慢路径仅作兜底。
+                new_players = {}
+                pid_arr, pname_arr = arrs['player_id'], arrs['player']
+                for row_i in range(n_events):
+                    raw_pid = pid_arr[row_i]
+                    if _has_val(raw_pid) and _has_val(pname_arr[row_i]):
+                        pid = int(raw_pid)
+                        if pid not in player_cache and pid not in new_players:
+                            new_players[pid] = str(pname_arr[row_i])
+                if new_players:
+                    inserted = execute_values(
+                        cursor, _SQL_BULK_INSERT_PLAYERS,
+                        [(pid, nm, nm) for pid, nm in new_players.items()],
+                        fetch=True)
+                    for pid, internal_pid in inserted:
+                        player_cache[pid] = internal_pid
+
+                for row_i in range(n_events):
+                    # Obtenir l'id joueur interne (ou insérer le joueur)
+                    player_internal_id = None
+                    sb_player_id = None
+                    player_name = None
+
+                    raw_player = arrs['player'][row_i]
+                    raw_player_id = arrs['player_id'][row_i]
+                    if _has_val(raw_player) and _has_val(raw_player_id):
+                        sb_player_id = int(raw_player_id)
+                        player_name = str(raw_player)
+
+                        # Chercher un joueur existant (cache, SELECT seulement
+                        # pour les nouveaux joueurs) / 先查缓存，仅新球员才落库
+                        player_internal_id = player_cache.get(sb_player_id)
+                        if player_internal_id is None:
+                            # Insérer le nouveau joueur
+                            cursor.execute(_SQL_INSERT_PLAYER,
+                                           (sb_player_id, player_name, player_name))
+                            cursor.execute(_SQL_SELECT_PLAYER_BY_SB_ID,
+                                           (sb_player_id,))
+                            player_result = cursor.fetchone()
+                            if player_result:
+                                player_internal_id = player_result[0]
+                                player_cache[sb_player_id] = player_internal_id
+
+                    # Coordonnées précalculées (position, passe, tir, conduite)
+                    # 预计算的坐标（位置、传球、射门、带球）
+                    location_x, location_y = loc_x[row_i], loc_y[row_i]
+                    pass_end_x, pass_end_y = pel_x[row_i], pel_y[row_i]
+                    shot_end_x, shot_end_y = sel_x[row_i], sel_y[row_i]
+                    carry_end_x, carry_end_y = cel_x[row_i], cel_y[row_i]
+
+                    pass_recipient_id = None
+                    raw_recipient = arrs['pass_recipient_id'][row_i]
+                    if _has_val(raw_recipient):
+                        pass_recipient_id = int(raw_recipient)
+
+                    # Obtenir team_id et équipe en possession (cache)
+                    team_internal_id = None
+                    raw_team = arrs['team'][row_i]
+                    if _has_val(raw_team):
+                        team_internal_id = team_cache.get(str(raw_team))
+
+                    poss_team_id = None
+                    raw_poss_team = arrs['possession_team'][row_i]
+                    if _has_val(raw_poss_team):
+                        poss_team_id = team_cache.get(str(raw_poss_team))
+
+                    # L'event_id doit être valide (chaîne UUID StatsBomb)
+                    event_id_val = arrs['id'][row_i]
+                    if not _has_val(event_id_val):
+                        continue
+                    event_id_str = str(event_id_val)
 
-            if (i + 1) % 5 == 0:
-                conn.commit()
-                print(f"   Progress: {i+1}/{len(match_ids)} matches processed ({total_events} events)")
+                    event_rows.append((
+                            event_id_str,
+                            internal_match_id,
+                            _to_pg_val(_scalar(arrs['index'][row_i])),
+                            _to_pg_val(_scalar(arrs['period'][row_i])),
+                            _scalar(arrs['timestamp'][row_i]),  # str
+                            _to_pg_val(_scalar(arrs['minute'][row_i])),
+                            _to_pg_val(_scalar(arrs['second'][row_i])),
+                            _scalar(arrs['type'][row_i]),  # str
+                            _to_pg_val(_scalar(arrs['type_id'][row_i])),
+                            _to_pg_val(_scalar(arrs['possession'][row_i])),
+                            poss_team_id,
+                            _scalar(arrs['play_pattern'][row_i]),  # str
+                            team_internal_id,
+                            player_internal_id,
+                            _scalar(arrs['position'][row_i]),  # str
+                            _to_pg_val(location_x),
+                            _to_pg_val(location_y),
+                            _to_pg_val(_scalar(arrs['duration'][row_i])),
+                            _to_pg_bool(_scalar(arrs['under_pressure'][row_i])),
+                            pass_recipient_id,
+                            _to_pg_val(_scalar(arrs['pass_length'][row_i])),
+                            _to_pg_val(_scalar(arrs['pass_angle'][row_i])),
+                            _scalar(arrs['pass_height'][row_i]),  # str
+                            _to_pg_val(pass_end_x),
+                            _to_pg_val(pass_end_y),
+                            _scalar(arrs['pass_outcome'][row_i]),
+                            _scalar(arrs['pass_type'][row_i]),
+                            _scalar(arrs['pass_body_part'][row_i]),
+                            _to_pg_bool(_scalar(arrs['pass_cross'][row_i])),
+                            _to_pg_val(_scalar(arrs['shot_statsbomb_xg'][row_i])),
+                            _to_pg_val(shot_end_x),
+                            _to_pg_val(shot_end_y),
+                            _scalar(arrs['shot_outcome'][row_i]),
+                            _scalar(arrs['shot_technique'][row_i]),
+                            _scalar(arrs['shot_body_part'][row_i]),
+                            _scalar(arrs['shot_type'][row_i]),
+                            _to_pg_bool(_scalar(arrs['shot_first_time'][row_i])),
+                            _to_pg_val(carry_end_x),
+                            _to_pg_val(carry_end_y),
+                            _scalar(arrs['dribble_outcome'][row_i]),
+                            _to_pg_val(_scalar(arrs['obv_total_net'][row_i])),
+                            _to_pg_val(_scalar(arrs['obv_for_net'][row_i])),
+                            _to_pg_val(_scalar(arrs['obv_against_net'][row_i])),
+                    ))
 
-        except Exception as e:
-            print(f"   ⚠️  Error fetching events for match {sb_match_id}: {e}")
-            continue
+                    # Flush par lot / 按批落盘
+                    if len(event_rows) >= _EVENT_BATCH_SIZE:
+                        _flush_events()
+
+                if (i + 1) % _COMMIT_EVERY == 0:
+                    _flush_events()
+                    conn.commit()
+                if (i + 1) % 5 == 0:
+                    print(f"   Progress: {i+1}/{len(match_ids)} matches processed ({total_events} events)")
+
+            except Exception as e:
+                print(f"   ⚠️  Error processing events for match {sb_match_id}: {e}")
+                # Purger la transaction avortée, sinon toute requête suivante
+                # échoue en InFailedSqlTransaction / 回滚失败事务，避免后续语句全部报错
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                continue
+
+        _flush_events()
+        conn.commit()
+    finally:
+        _recreate_event_indexes(conn, cursor, dropped_indexes)
 
-    conn.commit()
     print(f"✅ Stored {total_events} events from {len(match_ids)} matches")
     return total_events
 
@@ -570,50 +904,49 @@ def ingest_events(conn, matches_df, max_matches=None):
 # 5. 首发/换人入库（match_lineups 表）
 # ============================================================
 
-def _parse_minutes_from_timestamp(ts):
-    """Parse 'HH:MM:SS.mmm' or 'HH:MM:SS' to total minutes (int)."""
-    if not ts or (isinstance(ts, float) and pd.isna(ts)):
-        return None
-    ts = str(ts).strip()
-    parts = ts.split(':')
-    if len(parts) < 3:
-        return None
-    try:
-        h, m = int(parts[0]), int(parts[1])
-        s = float(parts[2]) if '.' in parts[2] else int(parts[2])
-        return int(h * 60 + m + s / 60)
-    except (ValueError, TypeError):
-        return None
-
-
 def ingest_match_lineups(conn, matches_df, max_matches=None):
     """
     Fetch and store match lineups from StatsBomb API.
     Populates match_lineups with player, team, position, is_starter, minutes_played.
     """
     cursor = conn.cursor()
+    _tune_session_for_bulk_load(conn, cursor)
     match_ids = matches_df['match_id'].tolist()
     if max_matches:
         match_ids = match_ids[:max_matches]
 
+    # Caches de résolution d'ids, mêmes correspondances stables que pour les
+    # events / id 解析缓存（与 events 入库一致，运行期间稳定）
+    cursor.execute(
+        f"SELECT statsbomb_team_id, team_id FROM {table('teams')} "
+        f"WHERE statsbomb_team_id IS NOT NULL"
+    )
+    team_by_sb_id = dict(cursor.fetchall())
+    cursor.execute(f"SELECT LOWER(team_name), team_id FROM {table('teams')}")
+    team_by_lower_name = dict(cursor.fetchall())
+    cursor.execute(
+        f"SELECT statsbomb_player_id, player_id FROM {table('players')} "
+        f"WHERE statsbomb_player_id IS NOT NULL"
+    )
+    player_cache = dict(cursor.fetchall())
+    cursor.execute(
+        f"SELECT statsbomb_match_id, match_id FROM {table('matches')} "
+        f"WHERE statsbomb_match_id IS NOT NULL"
+    )
+    match_cache = dict(cursor.fetchall())
+
     if INCREMENTAL_UPDATE:
-        to_fetch = []
-        for sb_mid in match_ids:
-            cursor.execute(
-                f"SELECT match_id FROM {table('matches')} WHERE statsbomb_match_id = %s",
-                (int(sb_mid),)
-            )
-            row = cursor.fetchone()
-            if not row:
-                continue
-            internal_match_id = row[0]
-            cursor.execute(
-                f"SELECT 1 FROM {table('match_lineups')} WHERE match_id = %s LIMIT 1",
-                (internal_match_id,)
-            )
-            if cursor.fetchone() is None:
-                to_fetch.append(sb_mid)
-        match_ids = to_fetch
+        # Une seule requête ensembliste pour les matchs ayant déjà un lineup
+        # 一次集合查询找出已有首发的比赛
+        cursor.execute(
+            f"SELECT DISTINCT m.statsbomb_match_id FROM {table('match_lineups')} l "
+            f"JOIN {table('matches')} m ON l.match_id = m.match_id "
+            f"WHERE m.statsbomb_match_id = ANY(%s)",
+            ([int(m) for m in match_ids],)
+        )
+        already = {r[0] for r in cursor.fetchall()}
+        match_ids = [m for m in match_ids
+                     if int(m) in match_cache and int(m) not in already]
         if not match_ids:
             print(" All matches already have lineups (INCREMENTAL_UPDATE), skipping.")
             return 0
@@ -622,40 +955,83 @@ def ingest_match_lineups(conn, matches_df, max_matches=None):
         print(f" Fetching lineups for {len(match_ids)} matches...")
 
     total_lineups = 0
-    for i, sb_match_id in enumerate(match_ids):
+
+    # Upsert groupé des lineups : un VALUES multi-lignes par lot. Dédoublonné
+    # par (match_id, player_id) — ON CONFLICT DO UPDATE refuse deux fois la
+    # même ligne dans un même ordre.
+    # lineups 批量 upsert：按 (match_id, player_id) 去重，同一语句内
+    # ON CONFLICT DO UPDATE 不允许重复命中同一行。
+    sql_insert_lineups = f"""
+        INSERT INTO {table("match_lineups")}
+        (match_id, player_id, team_id, jersey_number, position, is_starter, minutes_played)
+        VALUES %s
+        ON CONFLICT (match_id, player_id) DO UPDATE SET
+            team_id = COALESCE(EXCLUDED.team_id, match_lineups.team_id),
+            jersey_number = COALESCE(EXCLUDED.jersey_number, match_lineups.jersey_number),
+            position = COALESCE(EXCLUDED.position, match_lineups.position),
+            is_starter = COALESCE(EXCLUDED.is_starter, match_lineups.is_starter),
+            minutes_played = COALESCE(EXCLUDED.minutes_played, match_lineups.minutes_played)
+    """
+    lineup_rows = {}
+
+    def _flush_lineups():
+        nonlocal total_lineups
+        if not lineup_rows:
+            return
+        try:
+            execute_values(cursor, sql_insert_lineups, list(lineup_rows.values()),
+                           page_size=500)
+            total_lineups += len(lineup_rows)
+        except Exception as e:
+            conn.rollback()
+            print(f"     Error bulk-upserting lineups: {e}")
+        lineup_rows.clear()
+
+    def _fetch_lineups_safe(mid):
+        try:
+            return mid, get_lineups(int(mid)), None
+        except Exception as e:
+            return mid, None, e
+
+    for i, (sb_match_id, lineups_raw, fetch_err) in enumerate(
+            _parallel_fetch(_fetch_lineups_safe, match_ids)):
+        if fetch_err is not None:
+            print(f"     Error fetching lineups for match {sb_match_id}: {fetch_err}")
+            continue
         try:
-            lineups_raw = sb.lineups(match_id=int(sb_match_id), fmt="dict", creds=STATSBOMB_CREDS)
             if not lineups_raw:
                 continue
 
-            cursor.execute(
-                f"SELECT match_id FROM {table('matches')} WHERE statsbomb_match_id = %s",
-                (int(sb_match_id),)
-            )
-            result = cursor.fetchone()
-            if not result:
+            internal_match_id = match_cache.get(int(sb_match_id))
+            if internal_match_id is None:
                 continue
-            internal_match_id = result[0]
 
             for sb_team_id, team_data in lineups_raw.items():
                 team_name = team_data.get("team_name") or ""
                 lineup_list = team_data.get("lineup") or []
 
-                cursor.execute(
-                    f"SELECT team_id FROM {table('teams')} WHERE statsbomb_team_id = %s OR LOWER(team_name) = LOWER(%s)",
-                    (int(sb_team_id), team_name)
-                )
-                team_row = cursor.fetchone()
-                internal_team_id = team_row[0] if team_row else None
-
-                # Compléter statsbomb_team_id si manquant (lineups à l'ID précis)
-                if internal_team_id:
-                    cursor.execute(
-                        f"UPDATE {table('teams')} SET statsbomb_team_id = %s WHERE team_id = %s AND statsbomb_team_id IS NULL",
-                        (int(sb_team_id), internal_team_id),
-                    )
-
-                for p in lineup_list:
+                internal_team_id = team_by_sb_id.get(int(sb_team_id))
+                if internal_team_id is None:
+                    internal_team_id = team_by_lower_name.get(team_name.lower())
+                    # Compléter statsbomb_team_id si manquant (lineups à l'ID précis)
+                    if internal_team_id:
+                        cursor.execute(_SQL_LINK_TEAM_SB_ID,
+                                       (int(sb_team_id), internal_team_id))
+                        team_by_sb_id[int(sb_team_id)] = internal_team_id
+
+                # Parse vectorisé des timestamps 'to' : une passe pd.to_timedelta
+                # par équipe au lieu d'un split/cast Python par joueur
+                # 向量化解析 'to' 时间戳：每队一次 pd.to_timedelta，替代逐人字符串切分
+                to_ts_list = [
+                    (p.get("positions") or [{}])[-1].get("to")
+                    for p in lineup_list
+                ]
+                mins = pd.to_timedelta(
+                    pd.Series(to_ts_list, dtype="object"), errors='coerce'
+                ).dt.total_seconds() / 60
+                minutes_by_idx = [int(m) if pd.notna(m) else None for m in mins]
+
+                for idx, p in enumerate(lineup_list):
                     sb_player_id = p.get("player_id")
                     player_name = p.get("player_name") or p.get("player_nickname") or ""
                     jersey_number = p.get("jersey_number")
@@ -672,66 +1048,48 @@ def ingest_match_lineups(conn, matches_df, max_matches=None):
                         first_pos = positions[0]
                         position_str = first_pos.get("position")
                         is_starter = (first_pos.get("start_reason") or "") == "Starting XI"
-                        last_pos = positions[-1]
-                        to_ts = last_pos.get("to")
-                        if to_ts:
-                            minutes_played = _parse_minutes_from_timestamp(to_ts)
-
-                    cursor.execute(
-                        f"SELECT player_id FROM {table('players')} WHERE statsbomb_player_id = %s",
-                        (int(sb_player_id),)
-                    )
-                    player_row = cursor.fetchone()
-                    if player_row:
-                        internal_player_id = player_row[0]
-                    else:
-                        cursor.execute(f"""
-                            INSERT INTO {table("players")}
-                            (statsbomb_player_id, statsbomb_player_name, player_name)
-                            VALUES (%s, %s, %s)
-                            ON CONFLICT (statsbomb_player_id) DO NOTHING
-                        """, (int(sb_player_id), player_name, player_name or "Unknown"))
-                        cursor.execute(
-                            f"SELECT player_id FROM {table('players')} WHERE statsbomb_player_id = %s",
-                            (int(sb_player_id),)
-                        )
+                        minutes_played = minutes_by_idx[idx]
+
+                    internal_player_id = player_cache.get(int(sb_player_id))
+                    if internal_player_id is None:
+                        cursor.execute(_SQL_INSERT_PLAYER,
+                                       (int(sb_player_id), player_name,
+                                        player_name or "Unknown"))
+                        cursor.execute(_SQL_SELECT_PLAYER_BY_SB_ID,
+                                       (int(sb_player_id),))
                         player_row = cursor.fetchone()
                         if not player_row:
                             continue
                         internal_player_id = player_row[0]
+                        player_cache[int(sb_player_id)] = internal_player_id
 
-                    try:
-                        cursor.execute(f"""
-                            INSERT INTO {table("match_lineups")}
-                            (match_id, player_id, team_id, jersey_number, position, is_starter, minutes_played)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (match_id, player_id) DO UPDATE SET
-                                team_id = COALESCE(EXCLUDED.team_id, match_lineups.team_id),
-                                jersey_number = COALESCE(EXCLUDED.jersey_number, match_lineups.jersey_number),
-                                position = COALESCE(EXCLUDED.position, match_lineups.position),
-                                is_starter = COALESCE(EXCLUDED.is_starter, match_lineups.is_starter),
-                                minutes_played = COALESCE(EXCLUDED.minutes_played, match_lineups.minutes_played)
-                        """, (
-                            internal_match_id,
-                            internal_player_id,
-                            internal_team_id,
-                            int(jersey_number) if jersey_number is not None and pd.notna(jersey_number) else None,
-                            position_str,
-                            is_starter,
-                            minutes_played,
-                        ))
-                        total_lineups += 1
-                    except Exception as e:
-                        continue
+                    lineup_rows[(internal_match_id, internal_player_id)] = (
+                        internal_match_id,
+                        internal_player_id,
+                        internal_team_id,
+                        int(jersey_number) if jersey_number is not None and pd.notna(jersey_number) else None,
+                        position_str,
+                        is_starter,
+                        minutes_played,
+                    )
 
-            if (i + 1) % 5 == 0:
+            if (i + 1) % _COMMIT_EVERY == 0:
+                _flush_lineups()
                 conn.commit()
+            if (i + 1) % 5 == 0:
                 print(f"   Lineups progress: {i+1}/{len(match_ids)} matches ({total_lineups} entries)")
 
         except Exception as e:
-            print(f"     Error fetching lineups for match {sb_match_id}: {e}")
+            print(f"     Error processing lineups for match {sb_match_id}: {e}")
+            # Purger la transaction avortée avant le match suivant
+            # 回滚失败事务，避免后续语句报 InFailedSqlTransaction
+            try:
+                conn.rollback()
+            except Exception:
+                pass
             continue
 
+    _flush_lineups()
     conn.commit()
     print(f" Stored {total_lineups} lineup entries from {len(match_ids)} matches")
     return total_lineups
@@ -742,6 +1100,36 @@ def ingest_match_lineups(conn, matches_df, max_matches=None):
 # 6. 球员赛季统计入库（player_season_stats 表：goals_90, xG, passes 等）
 # ============================================================
 
+# Colonnes de stats saison, dans l'ordre des colonnes SQL de player_season_stats
+# (clearance_90 a un alias padj géré à part) / 赛季统计列（与 SQL 列顺序一致）
+_SEASON_STAT_COLS = (
+    'player_season_minutes', 'player_season_90s_played',
+    'player_season_appearances', 'player_season_starting_appearances',
+    'player_season_goals_90', 'player_season_npg_90',
+    'player_season_np_xg_90', 'player_season_np_xg_per_shot',
+    'player_season_np_shots_90', 'player_season_shot_on_target_ratio',
+    'player_season_conversion_ratio', 'player_season_assists_90',
+    'player_season_xa_90', 'player_season_key_passes_90',
+    'player_season_passing_ratio', 'player_season_op_passes_90',
+    'player_season_long_balls_90', 'player_season_long_ball_ratio',
+    'player_season_crosses_90', 'player_season_crossing_ratio',
+    'player_season_passes_into_box_90', 'player_season_through_balls_90',
+    'player_season_deep_progressions_90', 'player_season_dribbles_90',
+    'player_season_dribble_ratio', 'player_season_carries_90',
+    'player_season_carry_length', 'player_season_turnovers_90',
+    'player_season_dispossessions_90', 'player_season_tackles_90',
+    'player_season_interceptions_90',
+    'player_season_tackles_and_interceptions_90',
+    'player_season_clearance_90', 'player_season_blocks_per_shot',
+    'player_season_pressures_90', 'player_season_counterpressures_90',
+    'player_season_dribbled_past_90', 'player_season_fouls_90',
+    'player_season_obv_90', 'player_season_obv_pass_90',
+    'player_season_obv_shot_90', 'player_season_obv_defensive_action_90',
+    'player_season_obv_dribble_carry_90', 'player_season_save_ratio',
+    'player_season_goals_faced_90', 'player_season_gsaa_90',
+)
+
+
 def ingest_player_season_stats(conn, competition_id, season_id):
     """Fetch and store player season stats."""
     print(f"📡 Fetching player season stats...")
@@ -760,69 +1148,56 @@ def ingest_player_season_stats(conn, competition_id, season_id):
         return 0
 
     cursor = conn.cursor()
-    count = 0
 
-    for _, row in stats.iterrows():
-        sb_player_id = int(row.get('player_id', 0))
-        player_name = str(row.get('player_name', ''))
+    # Même réglage de session que les chargements events/lineups :
+    # synchronous_commit off masque le fsync des commits de ce lot
+    # 与事件/首发入库相同的会话调优：synchronous_commit off 隐藏提交的 fsync
+    _tune_session_for_bulk_load(conn, cursor)
+
+    # Résolution groupée des ids : un SELECT ... = ANY(%s) pour les joueurs,
+    # un pour les équipes, et un upsert groupé des joueurs inconnus — au lieu
+    # de 2-3 requêtes par ligne de stats.
+    # 批量解析 id：两条 ANY(%s) 查询 + 一次批量 upsert，替代每行 2-3 次请求。
+    name_by_sb = {}
+    if 'player_id' in stats.columns:
+        for pid, nm in zip(stats['player_id'].tolist(),
+                           stats['player_name'].tolist()
+                           if 'player_name' in stats.columns
+                           else [''] * len(stats)):
+            if pid is None or (isinstance(pid, float) and pd.isna(pid)):
+                continue
+            name_by_sb.setdefault(int(pid), str(nm or ''))
 
-        # Vérifier que le joueur existe
+    player_by_sb = {}
+    if name_by_sb:
         cursor.execute(
-            f"SELECT player_id FROM {table('players')} WHERE statsbomb_player_id = %s",
-            (sb_player_id,)
+            f"SELECT statsbomb_player_id, player_id FROM {table('players')} "
+            f"WHERE statsbomb_player_id = ANY(%s)",
+            (list(name_by_sb),)
         )
-        result = cursor.fetchone()
-        if result:
-            player_internal_id = result[0]
-        else:
-            cursor.execute(f"""
-                INSERT INTO {table("players")} 
-                (statsbomb_player_id, statsbomb_player_name, player_name)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (statsbomb_player_id) DO NOTHING
-            """, (sb_player_id, player_name, player_name))
+        player_by_sb = dict(cursor.fetchall())
+        missing = [pid for pid in name_by_sb if pid not in player_by_sb]
+        if missing:
+            inserted = execute_values(
+                cursor, _SQL_BULK_INSERT_PLAYERS,
+                [(pid, name_by_sb[pid], name_by_sb[pid]) for pid in missing],
+                fetch=True)
+            player_by_sb.update(dict(inserted))
+
+    team_by_name = {}
+    if 'team_name' in stats.columns:
+        team_names = [str(t) for t in stats['team_name'].dropna().unique().tolist()]
+        if team_names:
             cursor.execute(
-                f"SELECT player_id FROM {table('players')} WHERE statsbomb_player_id = %s",
-                (sb_player_id,)
+                f"SELECT team_name, team_id FROM {table('teams')} "
+                f"WHERE team_name = ANY(%s)",
+                (team_names,)
             )
-            result = cursor.fetchone()
-            player_internal_id = result[0] if result else None
+            team_by_name = dict(cursor.fetchall())
 
-        if not player_internal_id:
-            continue
-
-        # Obtenir l'id équipe interne
-        team_internal_id = None
-        if pd.notna(row.get('team_name')):
-            cursor.execute(
-                f"SELECT team_id FROM {table('teams')} WHERE team_name = %s",
-                (str(row['team_name']),)
-            )
-            team_result = cursor.fetchone()
-            if team_result:
-                team_internal_id = team_result[0]
-
-        def sg(col, default=None):
-            """Safe get from row - returns scalar (avoids array unpacking in SQL)."""
-            val = row.get(col)
-            if val is None or (isinstance(val, float) and pd.isna(val)):
-                return default
-            if isinstance(val, np.ndarray):
-                return val.item() if val.size == 1 else default
-            return val
-
-        # Stocker les stats brutes en JSON (gérer numpy pour json.dumps)
-        def _to_json_val(v):
-            if v is None or (isinstance(v, float) and pd.isna(v)):
-                return None
-            if isinstance(v, np.ndarray):
-                return v.tolist() if v.size > 0 else None
-            return v
-        raw_json = json.dumps({k: _to_json_val(v) for k, v in row.items()
-                               if _to_json_val(v) is not None}, default=str)
-
-        cursor.execute(f"""
-            INSERT INTO {table("player_season_stats")} 
+    # Ordre INSERT multi-lignes construit une fois / 多行 INSERT 语句构建一次
+    sql_insert_stats = f"""
+            INSERT INTO {table("player_season_stats")}
             (player_id, statsbomb_player_id, team_id, competition_id, season_id,
              minutes_played, nineties_played, appearances, starting_appearances,
              goals_90, np_goals_90, np_xg_90, np_xg_per_shot, shots_90,
@@ -839,61 +1214,111 @@ def ingest_player_season_stats(conn, competition_id, season_id):
              obv_dribble_carry_90,
              save_ratio, goals_faced_90, gsaa_90,
              raw_stats_json)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
+            VALUES %s
+    """
+
+    # Itération orientée colonne : reindex aligne les ~46 colonnes attendues
+    # (NaN si absentes) et to_numpy livre des scalaires déjà déboxés — plus de
+    # Series par ligne ni de row.get par champ. raw_stats_json part d'une
+    # seule passe to_dict(orient='records').
+    # 列式迭代：reindex 对齐列（缺失为 NaN），to_numpy 逐行给出已拆箱标量；
+    # raw_stats_json 由一次 to_dict('records') 提供。
+    n_stats = len(stats)
+    none_col = np.full(n_stats, None, dtype=object)
+    metric_arr = stats.reindex(columns=list(_SEASON_STAT_COLS)).to_numpy(dtype=object)
+    padj_arr = (stats['player_season_padj_clearances_90'].to_numpy()
+                if 'player_season_padj_clearances_90' in stats.columns else none_col)
+    pid_arr = (stats['player_id'].to_numpy()
+               if 'player_id' in stats.columns else none_col)
+    team_arr = (stats['team_name'].to_numpy()
+                if 'team_name' in stats.columns else none_col)
+    # NaN → None en une seule passe C sur tout le DataFrame, puis dicts par
+    # ligne ; les cellules ndarray sont gérées par le default= de json.dumps.
+    # 整表一次 NaN→None（C 层），ndarray 单元交给 json.dumps 的 default 处理。
+    records = stats.replace({np.nan: None}).to_dict(orient='records')
+    clearance_idx = _SEASON_STAT_COLS.index('player_season_clearance_90')
+
+    def _json_default(v):
+        if isinstance(v, np.ndarray):
+            return v.tolist()
+        return str(v)
+
+    stat_rows = []
+    for row_i in range(n_stats):
+        raw_pid = _scalar(pid_arr[row_i])
+        if raw_pid is None:
+            continue
+        sb_player_id = int(raw_pid)
+        player_internal_id = player_by_sb.get(sb_player_id)
+        if not player_internal_id:
+            continue
+
+        # Obtenir l'id équipe interne (dict prérésolu)
+        team_internal_id = None
+        raw_team = team_arr[row_i]
+        if _has_val(raw_team):
+            team_internal_id = team_by_name.get(str(raw_team))
+
+        metrics = [_scalar(v) for v in metric_arr[row_i]]
+        # Alias padj si clearance_90 absent (même sémantique `or` qu'avant)
+        metrics[clearance_idx] = metrics[clearance_idx] or _scalar(padj_arr[row_i])
+
+        # Stocker les stats brutes en JSON (champs nuls omis comme avant) ;
+        # orjson sérialise les scalaires numpy nativement
+        raw_dict = {k: v for k, v in records[row_i].items() if v is not None}
+        if _orjson is not None:
+            raw_json = _orjson.dumps(
+                raw_dict, default=_json_default,
+                option=_orjson.OPT_SERIALIZE_NUMPY).decode()
+        else:
+            raw_json = json.dumps(raw_dict, default=_json_default)
+
+        stat_rows.append((
             player_internal_id, sb_player_id, team_internal_id,
-            competition_id, season_id,
-            sg('player_season_minutes'),
-            sg('player_season_90s_played'),
-            sg('player_season_appearances'),
-            sg('player_season_starting_appearances'),
-            sg('player_season_goals_90'),
-            sg('player_season_npg_90'),
-            sg('player_season_np_xg_90'),
-            sg('player_season_np_xg_per_shot'),
-            sg('player_season_np_shots_90'),
-            sg('player_season_shot_on_target_ratio'),
-            sg('player_season_conversion_ratio'),
-            sg('player_season_assists_90'),
-            sg('player_season_xa_90'),
-            sg('player_season_key_passes_90'),
-            sg('player_season_passing_ratio'),
-            sg('player_season_op_passes_90'),
-            sg('player_season_long_balls_90'),
-            sg('player_season_long_ball_ratio'),
-            sg('player_season_crosses_90'),
-            sg('player_season_crossing_ratio'),
-            sg('player_season_passes_into_box_90'),
-            sg('player_season_through_balls_90'),
-            sg('player_season_deep_progressions_90'),
-            sg('player_season_dribbles_90'),
-            sg('player_season_dribble_ratio'),
-            sg('player_season_carries_90'),
-            sg('player_season_carry_length'),
-            sg('player_season_turnovers_90'),
-            sg('player_season_dispossessions_90'),
-            sg('player_season_tackles_90'),
-            sg('player_season_interceptions_90'),
-            sg('player_season_tackles_and_interceptions_90'),
-            sg('player_season_clearance_90') or sg('player_season_padj_clearances_90'),
-            sg('player_season_blocks_per_shot'),
-            sg('player_season_pressures_90'),
-            sg('player_season_counterpressures_90'),
-            sg('player_season_dribbled_past_90'),
-            sg('player_season_fouls_90'),
-            sg('player_season_obv_90'),
-            sg('player_season_obv_pass_90'),
-            sg('player_season_obv_shot_90'),
-            sg('player_season_obv_defensive_action_90'),
-            sg('player_season_obv_dribble_carry_90'),
-            sg('player_season_save_ratio'),
-            sg('player_season_goals_faced_90'),
-            sg('player_season_gsaa_90'),
-            raw_json
+            competition_id, season_id, *metrics, raw_json
         ))
-        count += 1
+
+    # COPY FROM STDIN en CSV directement dans la table cible : pas de parsing
+    # SQL par ligne (51 colonnes larges). Sans contrainte unique sur
+    # player_season_stats, pas besoin de table de staging ni d'ON CONFLICT.
+    # En cas d'échec, repli sur l'INSERT multi-lignes classique.
+    # CSV COPY 直接写入目标表（51 列宽行免去逐行 SQL 解析）；失败则回退多行 INSERT。
+    if stat_rows:
+        stat_cols = (
+            "player_id, statsbomb_player_id, team_id, competition_id, season_id, "
+            "minutes_played, nineties_played, appearances, starting_appearances, "
+            "goals_90, np_goals_90, np_xg_90, np_xg_per_shot, shots_90, "
+            "shot_on_target_ratio, conversion_ratio, "
+            "assists_90, xa_90, key_passes_90, passing_ratio, passes_90, "
+            "long_balls_90, long_ball_ratio, crosses_90, crossing_ratio, "
+            "passes_into_box_90, through_balls_90, deep_progressions_90, "
+            "dribbles_90, dribble_ratio, carries_90, carry_length, "
+            "turnovers_90, dispossessions_90, "
+            "tackles_90, interceptions_90, tackles_and_interceptions_90, "
+            "clearances_90, blocks_per_shot, pressures_90, counterpressures_90, "
+            "dribbled_past_90, fouls_90, "
+            "obv_90, obv_pass_90, obv_shot_90, obv_defensive_action_90, "
+            "obv_dribble_carry_90, "
+            "save_ratio, goals_faced_90, gsaa_90, "
+            "raw_stats_json"
+        )
+        # Valider d'abord les joueurs/équipes insérés plus haut : le rollback
+        # du repli ne doit annuler que le COPY raté
+        conn.commit()
+        try:
+            buf = io.StringIO()
+            csv.writer(buf).writerows(stat_rows)
+            buf.seek(0)
+            cursor.copy_expert(
+                f"COPY {table('player_season_stats')} ({stat_cols}) "
+                f"FROM STDIN WITH (FORMAT csv)",
+                buf
+            )
+        except Exception as e:
+            print(f"   ⚠️  COPY failed ({e}), falling back to multi-row INSERT")
+            conn.rollback()
+            execute_values(cursor, sql_insert_stats, stat_rows, page_size=500)
+    count = len(stat_rows)
 
     conn.commit()
     print(f"✅ Stored season stats for {count} players")
@@ -912,30 +1337,35 @@ def update_player_info_from_mapping(conn, competition_id, season_id):
     """
     print("📡 Fetching StatsBomb player mapping data...")
     try:
-        import requests
-        from requests.auth import HTTPBasicAuth
-
         url = (
             f"https://data.statsbomb.com/api/v1/player-mapping"
             f"?competition-id={competition_id}&season-id={season_id}"
             f"&all-account-data=true"
         )
-        response = requests.get(
+        response = _MAPPING_SESSION.get(
             url,
             auth=HTTPBasicAuth(
                 STATSBOMB_CREDS['user'],
                 STATSBOMB_CREDS['passwd']
-            )
+            ),
+            timeout=30
         )
 
         if response.status_code != 200:
             print(f"   ⚠️  Player mapping API returned status {response.status_code}")
             return 0
 
-        mapping_data = response.json()
+        # Décodage JSON via orjson si présent (2-3× plus rapide que .json())
+        if _orjson is not None:
+            mapping_data = _orjson.loads(response.content)
+        else:
+            mapping_data = response.json()
         cursor = conn.cursor()
-        count = 0
 
+        # Préparer toutes les lignes puis un seul UPDATE ... FROM (VALUES %s) :
+        # 1 aller-retour réseau au lieu d'un UPDATE par joueur.
+        # 先收集所有行，再用一条 UPDATE ... FROM VALUES 批量更新（一次往返）。
+        info_rows = []
         for entry in mapping_data:
             # API Player Mapping v1 : offline_player_id = StatsBomb player ID
             sb_player_id = entry.get('offline_player_id')
@@ -944,27 +1374,58 @@ def update_player_info_from_mapping(conn, competition_id, season_id):
 
             # Champs API : player_birth_date, player_height, player_weight,
             # player_preferred_foot (typo doc : perferred), country_of_birth_name
-            cursor.execute(f"""
-                UPDATE {table("players")} SET
-                    date_of_birth = COALESCE(%s, date_of_birth),
-                    height_cm = COALESCE(%s, height_cm),
-                    weight_kg = COALESCE(%s, weight_kg),
-                    preferred_foot = COALESCE(%s, preferred_foot),
-                    nationality = COALESCE(%s, nationality),
-                    player_nickname = COALESCE(%s, player_nickname),
-                    updated_at = NOW()
-                WHERE statsbomb_player_id = %s
-            """, (
+            info_rows.append((
+                sb_player_id,
                 entry.get('player_birth_date'),
                 entry.get('player_height'),
                 entry.get('player_weight'),
                 entry.get('player_preferred_foot') or entry.get('player_perferred_foot'),
                 entry.get('country_of_birth_name'),
                 entry.get('player_nickname'),
-                sb_player_id
             ))
-            if cursor.rowcount > 0:
-                count += 1
+
+        # Grouper les entrées par sous-ensemble de champs renseignés et
+        # n'écrire que ces colonnes-là : pas de COALESCE ni de réécriture WAL
+        # pour les champs que l'API n'a pas retournés. En pratique la plupart
+        # des entrées sont complètes, donc très peu de groupes.
+        # 按非空字段子集分组，每组只更新这些列（API 未返回的字段不产生 WAL 写入）。
+        field_cols = (
+            ('dob', 'date_of_birth', ''),
+            ('height', 'height_cm', '::real'),
+            ('weight', 'weight_kg', '::real'),
+            ('foot', 'preferred_foot', ''),
+            ('nationality', 'nationality', ''),
+            ('nickname', 'player_nickname', ''),
+        )
+        groups = {}
+        for row in info_rows:
+            present = tuple(i for i in range(len(field_cols))
+                            if row[i + 1] is not None)
+            if not present:
+                continue
+            groups.setdefault(present, []).append(row)
+
+        count = 0
+        for present, group_rows in groups.items():
+            alias_cols = ['sb_id']
+            set_parts = []
+            for i in present:
+                alias, col, cast = field_cols[i]
+                alias_cols.append(alias)
+                # Le cast explicite évite une inférence de type douteuse
+                set_parts.append(f"{col} = v.{alias}{cast}")
+            set_parts.append("updated_at = NOW()")
+            sql_update_player_info = f"""
+                UPDATE {table("players")} p SET
+                    {', '.join(set_parts)}
+                FROM (VALUES %s) AS v({', '.join(alias_cols)})
+                WHERE p.statsbomb_player_id = v.sb_id
+            """
+            trimmed = [(r[0],) + tuple(r[i + 1] for i in present)
+                       for r in group_rows]
+            execute_values(cursor, sql_update_player_info, trimmed,
+                           page_size=1000)
+            count += cursor.rowcount
 
         conn.commit()
         print(f"✅ Updated biographical info for {count} players from mapping API")
@@ -975,6 +1436,49 @@ def update_player_info_from_mapping(conn, competition_id, season_id):
         return 0
 
 
+def _seed_match_players(conn, matches_df, max_matches=None):
+    """Pré-insérer et committer tous les joueurs des feuilles de match.
+
+    Lancé avant les ingestions events/lineups parallèles : une fois les
+    joueurs committés, aucun des deux threads ne crée les mêmes lignes
+    players dans sa propre transaction longue — plus d'attente croisée sur
+    un INSERT non committé de l'autre thread, ni de deadlock possible entre
+    l'upsert groupé (events) et l'insert ligne à ligne (lineups).
+    Les réponses lineups passent par le cache disque, la passe lineups qui
+    suit les relit donc gratuitement.
+    首发并行入库前先批量插入并提交全部球员：两个线程不再各自创建相同的
+    players 行，消除跨事务等待与死锁；lineups 响应走磁盘缓存，后续不重复拉取。
+    """
+    match_ids = matches_df['match_id'].tolist()
+    if max_matches:
+        match_ids = match_ids[:max_matches]
+
+    def _fetch_safe(mid):
+        try:
+            return get_lineups(int(mid))
+        except Exception:
+            return None
+
+    players = {}
+    for lineups_raw in _parallel_fetch(_fetch_safe, match_ids):
+        if not lineups_raw:
+            continue
+        for team_data in lineups_raw.values():
+            for p in team_data.get("lineup") or []:
+                pid = p.get("player_id")
+                nm = p.get("player_name") or p.get("player_nickname")
+                if pid and nm and int(pid) not in players:
+                    players[int(pid)] = str(nm)
+
+    if players:
+        cursor = conn.cursor()
+        execute_values(cursor, _SQL_BULK_INSERT_PLAYERS,
+                       [(pid, nm, nm) for pid, nm in players.items()],
+                       fetch=True)
+        conn.commit()
+        print(f"   Seeded {len(players)} players from match lineups")
+
+
 # ============================================================
 # Fonction principale / 主入口
 # ============================================================
@@ -1007,23 +1511,38 @@ def run_statsbomb_ingestion(conn=None, max_event_matches=None):
     # 3. Ingest matches
     matches_df = ingest_matches(conn, comp_id, season_id)
 
-    # 4. Ingest events (only matches with available event data)
+    # 4. Ingest events + lineups (only matches with available event data),
+    # en parallèle sur deux connexions du pool : chaque ingestion écrit ses
+    # propres tables (events / match_lineups). Les joueurs sont pré-insérés
+    # et committés avant le départ des threads pour que ceux-ci ne se
+    # bloquent pas mutuellement sur des INSERT players non committés.
+    # 事件与首发并行入库，各用连接池中独立连接写各自的表；
+    # 球员先统一插入并提交，避免两线程在未提交的 players 行上互相等待。
     if not matches_df.empty:
         matches_avail = matches_df[
             matches_df['match_status'].fillna('').str.lower() == 'available'
         ] if 'match_status' in matches_df.columns else matches_df
         if matches_avail.empty:
             matches_avail = matches_df
-        ingest_events(conn, matches_avail, max_matches=max_event_matches)
 
-    # 4b. Ingest match lineups (same filter)
-    if not matches_df.empty:
-        matches_avail = matches_df[
-            matches_df['match_status'].fillna('').str.lower() == 'available'
-        ] if 'match_status' in matches_df.columns else matches_df
-        if matches_avail.empty:
-            matches_avail = matches_df
-        ingest_match_lineups(conn, matches_avail, max_matches=max_event_matches)
+        _seed_match_players(conn, matches_avail, max_matches=max_event_matches)
+
+        pool = get_pool()
+        conn_events = pool.getconn()
+        conn_lineups = pool.getconn()
+        try:
+            with ThreadPoolExecutor(max_workers=2) as runners:
+                fut_events = runners.submit(
+                    ingest_events, conn_events, matches_avail,
+                    max_matches=max_event_matches)
+                fut_lineups = runners.submit(
+                    ingest_match_lineups, conn_lineups, matches_avail,
+                    max_matches=max_event_matches)
+                fut_events.result()
+                fut_lineups.result()
+        finally:
+            pool.putconn(conn_events)
+            pool.putconn(conn_lineups)
 
     # 5. Ingest player season stats
     ingest_player_season_stats(conn, comp_id, season_id)
@@ -14,11 +14,26 @@ Flux / 执行顺序 :
 """
 
 import re
+import csv
+import io
 import sys
 import os
 import time
+import pickle
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+from psycopg2.extras import execute_values
+
+# rapidfuzz optionnel pour l'appariement flou des noms (C++, SIMD) ; sans lui,
+# repli sur l'heuristique substring / 可选 rapidfuzz 做模糊姓名匹配，缺失则用子串启发式
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process
+except ImportError:
+    _rf_fuzz = _rf_process = None
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
@@ -30,23 +45,174 @@ from config import (
 )
 from src.database import get_connection, table
 
+# Session HTTP partagée avec keep-alive : un seul handshake TCP/TLS réutilisé
+# par le pool de threads, au lieu d'une connexion neuve par requête.
+# 共享 HTTP 会话（keep-alive 连接池），省去每次请求的 TCP/TLS 握手。
+_SESSION = requests.Session()
+_SESSION.headers.update(REQUEST_HEADERS)
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+_SESSION.mount('https://', _adapter)
+_SESSION.mount('http://', _adapter)
+
+# Threads de scraping : le parallélisme recouvre les RTT réseau, la cadence
+# globale reste bornée par le limiteur ci-dessous (budget politesse inchangé).
+# 爬虫线程数：并发只是重叠网络往返，总请求频率仍由下面的限速器控制。
+_SCRAPE_WORKERS = 4
+
+# Limiteur partagé : au plus une requête toutes les N secondes, tous threads
+# confondus. Remplace le sleep par appel — le RTT sort du chemin critique.
+# L'intervalle double après un 429 (plafonné) et revient à la base au
+# prochain succès / 间隔在 429 后翻倍（有上限），成功后恢复基准。
+_RATE_MIN_INTERVAL_SEC = max(1.0, float(TRANSFERMARKT_DETAIL_DELAY_SEC))
+_RATE_MAX_INTERVAL_SEC = 60.0
+_rate_lock = threading.Lock()
+_next_request_at = [0.0]
+_rate_interval = [_RATE_MIN_INTERVAL_SEC]
+
+
+# Regex précompilées : parse_player_row tourne sur des centaines de lignes,
+# autant ne compiler/chercher chaque motif qu'une fois au chargement du module.
+# 预编译正则：逐行解析时避免每次调用的模式查找/编译开销。
+_RE_TM_TEAM_ID = re.compile(r'/verein/(\d+)')
+_RE_TM_PLAYER_ID = re.compile(r'/spieler/(\d+)')
+_RE_DOB = re.compile(r'(\d{1,2}\s+\w+\.?\s+\d{4})')
+_RE_AGE = re.compile(r'\((\d+)\)')
+_RE_HEIGHT_M = re.compile(r'(\d+,\d+)\s*m')
+_RE_HEIGHT_CM = re.compile(r'(\d+)\s*cm')
+_RE_DETAIL_HEIGHT_M = re.compile(r'(\d+[,.]?\d*)\s*m')
+_RE_CONTRACT_SLASH = re.compile(r'(\d{1,2}/\d{1,2}/\d{4})')
+_RE_CONTRACT_DOT = re.compile(r'(\d{2}\.\d{2}\.\d{4})')
+# Nombre + suffixe d'unité capturés en une passe ; multiplicateur via dict
+# 一次匹配数字与单位后缀，倍率查表
+_RE_MARKET_VALUE = re.compile(r'([\d,\.]+)\s*(mrd|md|mio|m|k|tsd)?')
+_MV_MULTIPLIER = {None: 1.0, 'k': 1e3, 'tsd': 1e3, 'm': 1e6, 'mio': 1e6,
+                  'mrd': 1e9, 'md': 1e9}
+# Un seul scan au lieu de ~20 recherches de sous-chaînes par cellule
+_RE_POSITION = re.compile(
+    r'gardien|défenseur|milieu|attaquant|arrière|ailier|buteur|avant-centre'
+    r'|latéral|central|offensif|défensif'
+    r'|goalkeeper|defender|midfielder|forward'
+    r'|centre-back|left-back|right-back|centre forward|winger',
+    re.IGNORECASE)
+
+# Parser HTML : lxml (C, déjà dans requirements.txt) est nettement plus rapide
+# que html.parser pur Python ; repli sur ce dernier si lxml absent.
+# HTML 解析器：优先 lxml（C 实现，快得多），缺失时回退 html.parser。
+try:
+    import lxml  # noqa: F401 - seulement pour détecter la disponibilité
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+
+def _make_soup(html):
+    """Construire un BeautifulSoup avec le meilleur parser disponible."""
+    return BeautifulSoup(html, _HTML_PARSER)
+
+
+# Cache disque des pages (TTL 24h) : les re-runs de développement et les
+# remplissages incrémentaux ne retéléchargent pas des pages identiques — la
+# requête la plus rapide est celle qu'on ne fait pas. Même motif pickle que le
+# cache API StatsBomb ; surcharger le dossier via TM_PAGE_CACHE_DIR.
+# 页面磁盘缓存（24h 过期）：重跑时相同页面直接读本地，省去全部网络开销。
+_PAGE_CACHE_DIR = os.environ.get(
+    "TM_PAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                 "data_cache", "transfermarkt"),
+)
+_PAGE_CACHE_TTL_SEC = 24 * 3600
+
+
+class _CachedPage:
+    """Page relue du cache — même attribut .text qu'une réponse requests."""
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+def _page_cache_path(url):
+    digest = hashlib.md5(url.encode("utf-8")).hexdigest()
+    return os.path.join(_PAGE_CACHE_DIR, f"{digest}.pkl")
+
+
+def _page_cache_get(url):
+    """Relit une page mise en cache, None si absente/expirée/illisible."""
+    try:
+        path = _page_cache_path(url)
+        if time.time() - os.path.getmtime(path) > _PAGE_CACHE_TTL_SEC:
+            return None
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+    except Exception:
+        return None
+
+
+def _page_cache_put(url, text):
+    """Écrit une page dans le cache (meilleur effort, écriture atomique)."""
+    path = _page_cache_path(url)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(text, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+
+def _rate_limit_wait():
+    """Réserver le prochain créneau d'envoi (partagé entre threads)."""
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_request_at[0] - now
+        _next_request_at[0] = max(now, _next_request_at[0]) + _rate_interval[0]
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _rate_limit_backoff():
+    """Ralentir après un 429 : intervalle doublé jusqu'au plafond."""
+    with _rate_lock:
+        _rate_interval[0] = min(_rate_interval[0] * 2, _RATE_MAX_INTERVAL_SEC)
+
+
+def _rate_limit_reset():
+    """Revenir à la cadence de base après un succès."""
+    with _rate_lock:
+        _rate_interval[0] = _RATE_MIN_INTERVAL_SEC
+
+
+def make_request(url, max_retries=3, force=False):
+    """Make an HTTP request with retry logic, shared rate limiting and a
+    24h on-disk page cache (cache hits skip the rate limiter entirely)."""
+    if not force:
+        cached = _page_cache_get(url)
+        if cached is not None:
+            return _CachedPage(cached)
 
-def make_request(url, max_retries=3):
-    """Make an HTTP request with retry logic and rate limiting."""
     for attempt in range(max_retries):
         try:
-            time.sleep(2 + attempt)  # Limitation du débit (respectueuse)
-            response = requests.get(url, headers=REQUEST_HEADERS, timeout=15)
+            _rate_limit_wait()  # Limitation du débit (respectueuse, globale)
+            response = _SESSION.get(url, timeout=15)
             if response.status_code == 200:
+                _rate_limit_reset()
+                _page_cache_put(url, response.text)
                 return response
             elif response.status_code == 429:
+                _rate_limit_backoff()
                 print(f"   ⏳ Rate limited, waiting {10 * (attempt + 1)}s...")
                 time.sleep(10 * (attempt + 1))
             elif response.status_code == 403:
                 print(f"   ⚠️  Access denied (403) for {url}")
                 return None
+            elif response.status_code >= 500:
+                # Erreur serveur : réessayer / 服务端错误：重试
+                print(f"   ⚠️  HTTP {response.status_code} for {url}")
             else:
+                # Autre 4xx : inutile de réessayer / 其他 4xx：重试无意义
                 print(f"   ⚠️  HTTP {response.status_code} for {url}")
+                return None
         except requests.exceptions.RequestException as e:
             print(f"   ⚠️  Request error (attempt {attempt+1}): {e}")
             time.sleep(5)
@@ -70,7 +236,7 @@ def get_ligue1_teams():
         print("   ❌ Could not access Transfermarkt Ligue 1 page")
         return []
 
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = _make_soup(response.text)
     teams = []
 
     # Trouver les liens équipes dans la table principale
@@ -97,7 +263,7 @@ def get_ligue1_teams():
         full_url = TRANSFERMARKT_BASE_URL + href if not href.startswith('http') else href
 
         # Extraire l'ID équipe de l'URL
-        tm_id_match = re.search(r'/verein/(\d+)', href)
+        tm_id_match = _RE_TM_TEAM_ID.search(href)
         tm_id = tm_id_match.group(1) if tm_id_match else None
 
         teams.append({
@@ -136,7 +302,12 @@ def get_team_players(team_url, team_name):
         print(f"   ❌ Could not access team page for {team_name}")
         return []
 
-    soup = BeautifulSoup(response.text, 'html.parser')
+    # Ne matérialiser que le sous-arbre table.items : menus, pubs et pied de
+    # page constituent l'essentiel du DOM et ne servent à rien ici — important
+    # pour la mémoire quand plusieurs pages effectif sont parsées en parallèle.
+    # 只解析 table.items 子树（页面其余 DOM 无用），并发解析时显著省内存。
+    soup = BeautifulSoup(response.text, _HTML_PARSER,
+                         parse_only=SoupStrainer('table', class_='items'))
     players = []
 
     # Trouver les lignes joueurs dans la table effectif
@@ -169,7 +340,7 @@ def parse_player_row(row, team_name):
     player['url'] = TRANSFERMARKT_BASE_URL + href if not href.startswith('http') else href
 
     # Extraire l'ID joueur Transfermarkt
-    tm_id_match = re.search(r'/spieler/(\d+)', href)
+    tm_id_match = _RE_TM_PLAYER_ID.search(href)
     player['tm_id'] = tm_id_match.group(1) if tm_id_match else None
 
     # Numéro de maillot (ignorer '-' ou non-numérique)
@@ -182,31 +353,27 @@ def parse_player_row(row, team_name):
             except ValueError:
                 player["jersey_number"] = raw
 
-    # Position
+    # Extraire le texte de chaque cellule une seule fois : les blocs position/
+    # naissance/taille/contrat ci-dessous parcourent tous les mêmes <td>.
+    # 每个单元格只提取一次文本，下面各字段共用同一列表。
     pos_cells = row.select('td')
-    for cell in pos_cells:
-        text = cell.get_text(strip=True)
-        # Positions courantes sur Transfermarkt français
-        if any(pos in text.lower() for pos in [
-            'gardien', 'défenseur', 'milieu', 'attaquant',
-            'arrière', 'ailier', 'buteur', 'avant-centre',
-            'latéral', 'central', 'offensif', 'défensif',
-            'goalkeeper', 'defender', 'midfielder', 'forward',
-            'centre-back', 'left-back', 'right-back',
-            'centre forward', 'winger'
-        ]):
+    cells_text = [cell.get_text(strip=True) for cell in pos_cells]
+
+    # Position
+    for text in cells_text:
+        # Positions courantes sur Transfermarkt français (motif unique FR/EN)
+        if _RE_POSITION.search(text):
             player['position'] = text
             break
 
     # Date de naissance
-    for cell in pos_cells:
-        text = cell.get_text(strip=True)
+    for text in cells_text:
         # Formats de date ex. "1 janv. 2000 (25)" ou "01/01/2000"
-        dob_match = re.search(r'(\d{1,2}\s+\w+\.?\s+\d{4})', text)
+        dob_match = _RE_DOB.search(text)
         if dob_match:
             player['date_of_birth'] = dob_match.group(1)
             # Extraire l'âge
-            age_match = re.search(r'\((\d+)\)', text)
+            age_match = _RE_AGE.search(text)
             if age_match:
                 player['age'] = age_match.group(1)
             break
@@ -231,11 +398,10 @@ def parse_player_row(row, team_name):
         player['market_value_numeric'] = parse_market_value(player['market_value'])
 
     # Taille
-    for cell in pos_cells:
-        text = cell.get_text(strip=True)
-        height_match = re.search(r'(\d+,\d+)\s*m', text)
+    for text in cells_text:
+        height_match = _RE_HEIGHT_M.search(text)
         if not height_match:
-            height_match = re.search(r'(\d+)\s*cm', text)
+            height_match = _RE_HEIGHT_CM.search(text)
         if height_match:
             h = height_match.group(1)
             if ',' in h:
@@ -245,11 +411,10 @@ def parse_player_row(row, team_name):
             break
 
     # Fin de contrat
-    for cell in pos_cells:
-        text = cell.get_text(strip=True)
-        contract_match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', text)
+    for text in cells_text:
+        contract_match = _RE_CONTRACT_SLASH.search(text)
         if not contract_match:
-            contract_match = re.search(r'(\d{2}\.\d{2}\.\d{4})', text)
+            contract_match = _RE_CONTRACT_DOT.search(text)
         if contract_match:
             player['contract_expiry'] = contract_match.group(1)
 
@@ -269,24 +434,15 @@ def parse_market_value(value_str):
     # Supprimer les symboles de devise et espaces
     value_str = value_str.replace('€', '').replace('$', '').replace('£', '').strip()
 
+    # Nombre et suffixe d'unité en une seule passe regex, multiplicateur
+    # par table — plus de branches avec recherches répétées
+    m = _RE_MARKET_VALUE.search(value_str)
+    if not m:
+        return None
+
     try:
-        if 'mrd' in value_str or 'md' in value_str:
-            num = re.search(r'([\d,\.]+)', value_str)
-            if num:
-                return float(num.group(1).replace(',', '.')) * 1_000_000_000
-        elif 'mio' in value_str or 'm' in value_str:
-            num = re.search(r'([\d,\.]+)', value_str)
-            if num:
-                return float(num.group(1).replace(',', '.')) * 1_000_000
-        elif 'k' in value_str or 'tsd' in value_str:
-            num = re.search(r'([\d,\.]+)', value_str)
-            if num:
-                return float(num.group(1).replace(',', '.')) * 1_000
-        else:
-            num = re.search(r'([\d,\.]+)', value_str)
-            if num:
-                return float(num.group(1).replace(',', '.'))
-    except (ValueError, AttributeError):
+        return float(m.group(1).replace(',', '.')) * _MV_MULTIPLIER[m.group(2)]
+    except (ValueError, AttributeError, KeyError):
         pass
 
     return None
@@ -297,16 +453,29 @@ def parse_market_value(value_str):
 # 3. 球员详情页（合同到期、经纪人、身高、惯用脚、生日等）
 # ============================================================
 
+# Cache en mémoire des détails déjà parsés : le passage detailed et la passe
+# fill_null peuvent viser la même URL dans un même run — on ne refait alors ni
+# la requête ni le parse. Les résultats vides ne sont pas retenus (retry).
+# 进程内详情缓存：同一 URL 在 detailed 与补全两个阶段不重复抓取/解析；
+# 空结果不缓存（允许重试）。
+_detail_cache = {}
+_detail_cache_lock = threading.Lock()
+
+
 def get_player_detail(player_url):
     """
     Scrape individual player page for detailed info.
     Returns dict with additional player details (contract, agent, height, etc.)
     """
+    with _detail_cache_lock:
+        if player_url in _detail_cache:
+            return _detail_cache[player_url]
+
     response = make_request(player_url)
     if not response:
         return {}
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = _make_soup(response.text)
     details = {}
 
     # Essayer plusieurs structures de boîte info (TM met à jour la mise en page)
@@ -345,12 +514,12 @@ def get_player_detail(player_url):
                 elif "agent" in label or "conseiller" in label or "player agent" in label:
                     details["agent"] = value
                 elif "taille" in label or "height" in label or "size" in label:
-                    h_match = re.search(r"(\d+[,.]?\d*)\s*m", value)
+                    h_match = _RE_DETAIL_HEIGHT_M.search(value)
                     if h_match:
                         h = h_match.group(1).replace(",", ".")
                         details["height_cm"] = float(h) * 100
                     elif "cm" in value:
-                        h_match = re.search(r"(\d+)\s*cm", value)
+                        h_match = _RE_HEIGHT_CM.search(value)
                         if h_match:
                             details["height_cm"] = float(h_match.group(1))
                 elif (
@@ -381,19 +550,67 @@ def get_player_detail(player_url):
             details["market_value"] = mv_text
             details["market_value_numeric"] = parse_market_value(mv_text)
 
+    if details:
+        with _detail_cache_lock:
+            _detail_cache[player_url] = details
+
     return details
 
 
+def _get_player_detail_safe(player_url):
+    """Variante pour le pool de threads : jamais d'exception, {} au pire."""
+    try:
+        return get_player_detail(player_url)
+    except Exception as e:
+        print(f"      ⚠️  Detail scrape failed for {player_url}: {e}")
+        return {}
+
+
 # ============================================================
 # 4. Stockage en base (players + player_id_mapping)
 # 4. 入库（更新已有球员或插入新球员，通过姓名匹配关联）
 # ============================================================
 
-def store_transfermarkt_data(conn, players_data):
-    """Store scraped Transfermarkt data and link to existing players."""
+def store_transfermarkt_data(conn, players_data, commit=True):
+    """Store scraped Transfermarkt data and link to existing players.
+
+    commit=False laisse l'appelant valider une seule fois en fin de
+    pipeline (un fsync au lieu d'un par étape) / commit=False 由调用方统一提交。
+    """
     cursor = conn.cursor()
-    linked = 0
-    new = 0
+
+    # Boucle 1 : apparier chaque joueur scrapé, accumuler les lignes.
+    # Boucle 2 : trois écritures groupées (UPDATE ... FROM VALUES, upsert
+    # mapping, INSERT multi-lignes) au lieu de ~3 requêtes par joueur.
+    # 先逐个匹配并收集行，再用三条批量语句写库（替代每人 ~3 次往返）。
+    update_rows = {}    # player_id → tuple (premier match gagne)
+    mapping_rows = {}   # player_id → tm_id
+    new_rows = {}       # tm_id (ou nom) → tuple : le COPY n'a pas d'ON
+                        # CONFLICT, un inconnu vu sur deux pages d'effectif
+                        # ne doit produire qu'une seule ligne
+
+    # Index en mémoire des joueurs existants : un seul SELECT au lieu d'un
+    # balayage séquentiel de players (quadruple OR LIKE) par joueur scrapé.
+    # Le match exact est un accès dict ; le repli substring sur le nom de
+    # famille reproduit les LIKE %nom% d'origine.
+    # 现有球员的内存索引：一次 SELECT 替代每个球员的模糊查询；
+    # 精确匹配走字典，姓氏子串回退等价于原 LIKE %...%。
+    cursor.execute(
+        f"SELECT player_id, LOWER(player_name), "
+        f"LOWER(COALESCE(statsbomb_player_name, '')) FROM {table('players')}"
+    )
+    known_players = cursor.fetchall()
+    exact_by_name = {}
+    fuzzy_choices = []   # noms candidats pour rapidfuzz
+    fuzzy_pids = []      # pid aligné sur fuzzy_choices
+    for pid, nm, sb_nm in known_players:
+        exact_by_name.setdefault(nm, []).append(pid)
+        fuzzy_choices.append(nm)
+        fuzzy_pids.append(pid)
+        if sb_nm:
+            exact_by_name.setdefault(sb_nm, []).append(pid)
+            fuzzy_choices.append(sb_nm)
+            fuzzy_pids.append(pid)
 
     for player in players_data:
         name = player.get('name', '')
@@ -406,98 +623,128 @@ def store_transfermarkt_data(conn, players_data):
         name_parts = name.split()
         last_name = name_parts[-1] if name_parts else name
 
-        cursor.execute(f"""
-            SELECT player_id FROM {table('players')} 
-            WHERE LOWER(player_name) = LOWER(%s)
-            OR LOWER(statsbomb_player_name) = LOWER(%s)
-            OR LOWER(player_name) LIKE %s
-            OR LOWER(statsbomb_player_name) LIKE %s
-        """, (
-            name, name,
-            f"%{last_name.lower()}%",
-            f"%{last_name.lower()}%"
-        ))
-        results = cursor.fetchall()
-
-        # Si plusieurs matchs avec le nom, tenter un match plus précis
-        if len(results) > 1:
-            cursor.execute(f"""
-                SELECT player_id FROM {table('players')} 
-                WHERE LOWER(player_name) = LOWER(%s)
-                OR LOWER(statsbomb_player_name) = LOWER(%s)
-            """, (name, name))
-            precise_results = cursor.fetchall()
-            if precise_results:
-                results = precise_results
+        # Match exact d'abord (équivalent du recentrage "si plusieurs
+        # résultats" d'avant) ; sinon rapidfuzz (tolère fautes et variantes
+        # d'orthographe) ; en dernier recours substring sur le nom de famille
+        results = exact_by_name.get(name.lower())
+        if not results and _rf_process is not None and fuzzy_choices:
+            best = _rf_process.extractOne(
+                name.lower(), fuzzy_choices,
+                scorer=_rf_fuzz.WRatio, score_cutoff=85)
+            if best:
+                results = [fuzzy_pids[best[2]]]
+        if not results:
+            last_l = last_name.lower()
+            results = [pid for pid, nm, sb_nm in known_players
+                       if last_l in nm or (sb_nm and last_l in sb_nm)]
+
+        jersey = (str(player['jersey_number'])
+                  if player.get('jersey_number') is not None else None)
 
         if results:
-            player_id = results[0][0]
-            # Mettre à jour le joueur existant avec les données Transfermarkt
-            cursor.execute(f"""
-                UPDATE {table('players')} SET
-                    transfermarkt_player_id = COALESCE(%s, transfermarkt_player_id),
-                    transfermarkt_url = COALESCE(%s, transfermarkt_url),
-                    market_value = COALESCE(%s, market_value),
-                    market_value_numeric = COALESCE(%s, market_value_numeric),
-                    contract_expiry = COALESCE(%s, contract_expiry),
-                    current_club = COALESCE(%s, current_club),
-                    jersey_number = COALESCE(%s, jersey_number),
-                    agent = COALESCE(%s, agent),
-                    nationality = COALESCE(%s, nationality),
-                    height_cm = COALESCE(%s, height_cm),
-                    preferred_foot = COALESCE(%s, preferred_foot),
-                    date_of_birth = COALESCE(%s, date_of_birth),
-                    primary_position = COALESCE(%s, primary_position),
-                    updated_at = NOW()
-                WHERE player_id = %s
-            """, (
-                tm_id,
-                player.get('url'),
-                player.get('market_value'),
-                player.get('market_value_numeric'),
-                player.get('contract_expiry'),
-                player.get('current_club'),
-                str(player['jersey_number']) if player.get('jersey_number') is not None else None,
-                player.get('agent'),
-                player.get('nationality'),
-                player.get('height_cm'),
-                player.get('preferred_foot'),
-                player.get('date_of_birth'),
-                player.get('position'),
-                player_id
-            ))
-            linked += 1
-
-            # Mettre à jour la table de mapping
-            cursor.execute(f"""
-                INSERT INTO {table('player_id_mapping')} 
-                (player_id, transfermarkt_player_id, mapping_method)
-                VALUES (%s, %s, 'name_match')
-                ON CONFLICT (player_id) DO UPDATE SET transfermarkt_player_id = EXCLUDED.transfermarkt_player_id
-            """, (player_id, tm_id))
-
+            player_id = results[0]
+            if player_id not in update_rows:
+                update_rows[player_id] = (
+                    player_id,
+                    tm_id,
+                    player.get('url'),
+                    player.get('market_value'),
+                    player.get('market_value_numeric'),
+                    player.get('contract_expiry'),
+                    player.get('current_club'),
+                    jersey,
+                    player.get('agent'),
+                    player.get('nationality'),
+                    player.get('height_cm'),
+                    player.get('preferred_foot'),
+                    player.get('date_of_birth'),
+                    player.get('position'),
+                )
+                mapping_rows[player_id] = tm_id
         else:
-            # Insérer comme nouveau joueur
-            cursor.execute(f"""
-                INSERT INTO {table('players')} 
-                (player_name, transfermarkt_player_id, transfermarkt_url,
-                 market_value, market_value_numeric, contract_expiry,
-                 current_club, jersey_number, nationality, height_cm,
-                 preferred_foot, date_of_birth, primary_position, agent)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
+            new_key = tm_id if tm_id is not None else name.lower()
+            if new_key in new_rows:
+                continue
+            new_rows[new_key] = (
                 name, tm_id, player.get('url'),
                 player.get('market_value'), player.get('market_value_numeric'),
                 player.get('contract_expiry'), player.get('current_club'),
-                str(player['jersey_number']) if player.get('jersey_number') is not None else None,
+                jersey,
                 player.get('nationality'),
                 player.get('height_cm'), player.get('preferred_foot'),
                 player.get('date_of_birth'), player.get('position'),
                 player.get('agent')
-            ))
-            new += 1
+            )
 
-    conn.commit()
+    # Mettre à jour les joueurs appariés en un seul UPDATE ... FROM VALUES
+    if update_rows:
+        execute_values(cursor, f"""
+            UPDATE {table('players')} p SET
+                transfermarkt_player_id = COALESCE(v.tm_id, p.transfermarkt_player_id),
+                transfermarkt_url = COALESCE(v.url, p.transfermarkt_url),
+                market_value = COALESCE(v.market_value, p.market_value),
+                market_value_numeric = COALESCE(v.market_value_numeric::real, p.market_value_numeric),
+                contract_expiry = COALESCE(v.contract_expiry, p.contract_expiry),
+                current_club = COALESCE(v.current_club, p.current_club),
+                jersey_number = COALESCE(v.jersey_number, p.jersey_number),
+                agent = COALESCE(v.agent, p.agent),
+                nationality = COALESCE(v.nationality, p.nationality),
+                height_cm = COALESCE(v.height_cm::real, p.height_cm),
+                preferred_foot = COALESCE(v.preferred_foot, p.preferred_foot),
+                date_of_birth = COALESCE(v.date_of_birth, p.date_of_birth),
+                primary_position = COALESCE(v.position, p.primary_position),
+                updated_at = NOW()
+            FROM (VALUES %s) AS v(player_id, tm_id, url, market_value,
+                 market_value_numeric, contract_expiry, current_club,
+                 jersey_number, agent, nationality, height_cm, preferred_foot,
+                 date_of_birth, position)
+            WHERE p.player_id = v.player_id
+        """, list(update_rows.values()), page_size=500)
+
+        # Mettre à jour la table de mapping (déjà dédupliquée par player_id)
+        execute_values(cursor, f"""
+            INSERT INTO {table('player_id_mapping')}
+            (player_id, transfermarkt_player_id, mapping_method)
+            VALUES %s
+            ON CONFLICT (player_id) DO UPDATE SET transfermarkt_player_id = EXCLUDED.transfermarkt_player_id
+        """, list(mapping_rows.items()),
+            template="(%s, %s, 'name_match')", page_size=500)
+
+    # Charger les nouveaux joueurs via COPY FROM STDIN (CSV) : un seul flux
+    # sans parsing SQL par ligne — décisif au premier chargement où la
+    # plupart des joueurs sont nouveaux. Repli INSERT multi-lignes si échec.
+    # 新球员用 CSV COPY 一次写入（首跑大多为新建）；失败回退多行 INSERT。
+    if new_rows:
+        new_player_cols = (
+            "player_name, transfermarkt_player_id, transfermarkt_url, "
+            "market_value, market_value_numeric, contract_expiry, "
+            "current_club, jersey_number, nationality, height_cm, "
+            "preferred_foot, date_of_birth, primary_position, agent"
+        )
+        # Valider d'abord les mises à jour : le rollback du repli ne doit
+        # annuler que le COPY raté
+        conn.commit()
+        try:
+            buf = io.StringIO()
+            csv.writer(buf).writerows(new_rows.values())
+            buf.seek(0)
+            cursor.copy_expert(
+                f"COPY {table('players')} ({new_player_cols}) "
+                f"FROM STDIN WITH (FORMAT csv)",
+                buf
+            )
+        except Exception as e:
+            print(f"   ⚠️  COPY failed ({e}), falling back to multi-row INSERT")
+            conn.rollback()
+            execute_values(cursor, f"""
+                INSERT INTO {table('players')} ({new_player_cols})
+                VALUES %s
+            """, list(new_rows.values()), page_size=500)
+
+    linked = len(update_rows)
+    new = len(new_rows)
+    if commit:
+        conn.commit()
     print(f"✅ Transfermarkt: linked {linked} existing players, created {new} new entries")
     return linked, new
 
@@ -507,10 +754,11 @@ def store_transfermarkt_data(conn, players_data):
 # 5. 增量补全（仅对 contract/agent 等仍为空且有 TM URL 的球员爬详情）
 # ============================================================
 
-def fill_null_transfermarkt_details(conn=None, max_players=None):
+def fill_null_transfermarkt_details(conn=None, max_players=None, commit=True):
     """
     Incremental: scrape detail pages only for players with transfermarkt_url
     but missing contract_expiry or agent. Does not re-download squad pages.
+    commit=False defers the commit to the caller (pipeline-level commit).
     """
     if conn is None:
         conn = get_connection()
@@ -538,49 +786,52 @@ def fill_null_transfermarkt_details(conn=None, max_players=None):
         return 0
 
     print(f"   Filling detail for {len(rows)} players missing contract/agent...")
-    updated = 0
-    for player_id, url, name in rows:
-        try:
-            details = get_player_detail(url)
-            if not details:
-                continue
-            time.sleep(TRANSFERMARKT_DETAIL_DELAY_SEC)
-            cursor.execute(
-                f"""
-                UPDATE {table('players')} SET
-                    contract_expiry = COALESCE(%s, contract_expiry),
-                    agent = COALESCE(%s, agent),
-                    date_of_birth = COALESCE(date_of_birth, %s),
-                    height_cm = COALESCE(height_cm, %s),
-                    preferred_foot = COALESCE(preferred_foot, %s),
-                    nationality = COALESCE(nationality, %s),
-                    primary_position = COALESCE(primary_position, %s),
-                    market_value = COALESCE(market_value, %s),
-                    market_value_numeric = COALESCE(market_value_numeric, %s),
-                    updated_at = NOW()
-                WHERE player_id = %s
-                """,
-                (
-                    details.get("contract_expiry"),
-                    details.get("agent"),
-                    details.get("date_of_birth"),
-                    details.get("height_cm"),
-                    details.get("preferred_foot"),
-                    details.get("nationality"),
-                    details.get("position"),
-                    details.get("market_value"),
-                    details.get("market_value_numeric"),
-                    player_id,
-                ),
-            )
-            if cursor.rowcount:
-                updated += 1
-            if updated % 10 == 0 and updated:
-                print(f"      Updated {updated}/{len(rows)}...")
-        except Exception as e:
-            print(f"      Skip {name}: {e}")
+    # Pages détail récupérées en parallèle, puis un seul UPDATE ... FROM
+    # VALUES pour toutes les lignes — plus d'UPDATE par joueur.
+    # 详情页并行抓取，随后一条批量 UPDATE 写回（不再逐人 UPDATE）。
+    with ThreadPoolExecutor(max_workers=_SCRAPE_WORKERS) as ex:
+        details_list = list(ex.map(_get_player_detail_safe,
+                                   [r[1] for r in rows]))
+
+    fill_rows = []
+    for (player_id, url, name), details in zip(rows, details_list):
+        if not details:
             continue
-    conn.commit()
+        fill_rows.append((
+            player_id,
+            details.get("contract_expiry"),
+            details.get("agent"),
+            details.get("date_of_birth"),
+            details.get("height_cm"),
+            details.get("preferred_foot"),
+            details.get("nationality"),
+            details.get("position"),
+            details.get("market_value"),
+            details.get("market_value_numeric"),
+        ))
+
+    updated = 0
+    if fill_rows:
+        execute_values(cursor, f"""
+            UPDATE {table('players')} p SET
+                contract_expiry = COALESCE(v.contract_expiry, p.contract_expiry),
+                agent = COALESCE(v.agent, p.agent),
+                date_of_birth = COALESCE(p.date_of_birth, v.date_of_birth),
+                height_cm = COALESCE(p.height_cm, v.height_cm::real),
+                preferred_foot = COALESCE(p.preferred_foot, v.preferred_foot),
+                nationality = COALESCE(p.nationality, v.nationality),
+                primary_position = COALESCE(p.primary_position, v.position),
+                market_value = COALESCE(p.market_value, v.market_value),
+                market_value_numeric = COALESCE(p.market_value_numeric, v.market_value_numeric::real),
+                updated_at = NOW()
+            FROM (VALUES %s) AS v(player_id, contract_expiry, agent,
+                 date_of_birth, height_cm, preferred_foot, nationality,
+                 position, market_value, market_value_numeric)
+            WHERE p.player_id = v.player_id
+        """, fill_rows, page_size=500)
+        updated = cursor.rowcount
+    if commit:
+        conn.commit()
     print(f"   ✅ Filled detail for {updated} players")
     return updated
 
@@ -615,48 +866,57 @@ def run_transfermarkt_scraping(conn=None, detailed=False, fill_nulls_only=False)
         print("❌ No teams found on Transfermarkt")
         return 0
 
-    # 2. Store team mapping
+    # 2. Store team mapping — un seul UPDATE ... FROM VALUES pour les ~18
+    # équipes au lieu d'un UPDATE par équipe
+    # 一条批量 UPDATE 写入所有球队的 Transfermarkt id
     cursor = conn.cursor()
-    for team in teams:
-        if team.get("tm_id"):
-            cursor.execute(
-                f"""
-                UPDATE {table('teams')} SET transfermarkt_team_id = %s
-                WHERE LOWER(team_name) LIKE %s
-            """,
-                (team["tm_id"], f"%{team['name'].lower().split()[0]}%"),
-            )
+    team_rows = [
+        (team["tm_id"], f"%{team['name'].lower().split()[0]}%")
+        for team in teams if team.get("tm_id")
+    ]
+    if team_rows:
+        execute_values(cursor, f"""
+            UPDATE {table('teams')} t SET transfermarkt_team_id = v.tm_id
+            FROM (VALUES %s) AS v(tm_id, pattern)
+            WHERE LOWER(t.team_name) LIKE v.pattern
+        """, team_rows, page_size=100)
     conn.commit()
 
-    # 3. Scrape players from each team
-    all_players = []
-    for i, team in enumerate(teams):
-        print(f"\n   [{i+1}/{len(teams)}] Scraping {team['name']}...")
-
-        players = get_team_players(team["url"], team["name"])
-        print(f"      Found {len(players)} players")
-
-        if detailed and players:
-            to_detail = players if not fill_nulls_only else players
-            for j, player in enumerate(to_detail):
-                if player.get("url"):
-                    details = get_player_detail(player["url"])
-                    player.update({k: v for k, v in details.items() if v is not None})
-                    time.sleep(TRANSFERMARKT_DETAIL_DELAY_SEC)
-                    if (j + 1) % 5 == 0:
-                        print(f"         Detail scraped: {j+1}/{len(to_detail)}")
+    # 3. Scrape players from each team — pages effectif en parallèle
+    # (la cadence HTTP globale reste bornée par _rate_limit_wait)
+    # 并行抓取各队阵容页（总请求频率仍受共享限速器约束）
+    with ThreadPoolExecutor(max_workers=_SCRAPE_WORKERS) as ex:
+        squads = list(ex.map(
+            lambda t: get_team_players(t["url"], t["name"]), teams))
 
+    all_players = []
+    for i, (team, players) in enumerate(zip(teams, squads)):
+        print(f"   [{i+1}/{len(teams)}] {team['name']}: {len(players)} players")
         all_players.extend(players)
 
+    # Pages détail en parallèle également (le limiteur remplace le sleep par joueur)
+    if detailed and all_players:
+        to_detail = [p for p in all_players if p.get("url")]
+        with ThreadPoolExecutor(max_workers=_SCRAPE_WORKERS) as ex:
+            detail_iter = ex.map(_get_player_detail_safe,
+                                 [p["url"] for p in to_detail])
+            for j, (player, details) in enumerate(zip(to_detail, detail_iter)):
+                player.update({k: v for k, v in details.items() if v is not None})
+                if (j + 1) % 5 == 0:
+                    print(f"      Detail scraped: {j+1}/{len(to_detail)}")
+
     print(f"\n Total players scraped: {len(all_players)}")
 
-    # 4. Store in database
+    # 4. Store in database (commit différé : un seul fsync en fin de pipeline)
     if all_players:
-        store_transfermarkt_data(conn, all_players)
+        store_transfermarkt_data(conn, all_players, commit=False)
 
     # 5. Incremental: fill contract/agent for players still missing (no re-squad scrape)
     if detailed or (INCREMENTAL_UPDATE and not fill_nulls_only):
-        fill_null_transfermarkt_details(conn)
+        fill_null_transfermarkt_details(conn, commit=False)
+
+    # Valider les étapes 4-5 en une fois / 步骤 4-5 一次性提交
+    conn.commit()
 
     print("\n✅ Transfermarkt scraping complete!")
     return len(all_players)